@@ -21,7 +21,8 @@ except ImportError:
 from app.db.base import Base
 
 from app.models.user import User 
-from app.models.post import Post, Reaction 
+from app.models.post import Post, PostReactionCount, Reaction 
+from app.models.rollup import ReactionRollup, RollupWatermark 
 
 config = context.config
 
@@ -0,0 +1,45 @@
+"""Add hourly/daily reaction rollups and their aggregation watermark
+
+Revision ID: 1582811aad7c
+Revises: 7b2dacfbefe2
+Create Date: 2026-10-18 13:15:37.552104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1582811aad7c'
+down_revision: Union[str, None] = '7b2dacfbefe2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('reaction_rollup',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.Enum('hour', 'day', name='rollup_granularity'), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('type', postgresql.ENUM('like', 'praise', 'empathy', 'interest', 'appreciation', name='reaction_type', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['post.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('post_id', 'granularity', 'bucket_start', 'type')
+    )
+    op.create_table('rollup_watermark',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('last_reaction_id', sa.BigInteger(), nullable=False),
+    sa.Column('observed_max_id', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Start from zero: the job backfills existing reactions in batches on its first runs.
+    op.execute("INSERT INTO rollup_watermark (name, last_reaction_id, observed_max_id) VALUES ('reaction_rollup', 0, 0)")
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermark')
+    op.drop_table('reaction_rollup')
+    sa.Enum(name='rollup_granularity').drop(op.get_bind(), checkfirst=True)
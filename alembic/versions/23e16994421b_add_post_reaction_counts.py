@@ -0,0 +1,52 @@
+"""Add post_reaction_counts and backfill from reaction
+
+Revision ID: 23e16994421b
+Revises: 4f636d08f3b3
+Create Date: 2026-10-18 09:12:05.418227
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '23e16994421b'
+down_revision: Union[str, None] = '4f636d08f3b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('post_reaction_counts',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('like', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('praise', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('empathy', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('interest', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('appreciation', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('total_reactions', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['post.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('post_id')
+    )
+
+    op.execute(
+        """
+        INSERT INTO post_reaction_counts (post_id, "like", praise, empathy, interest, appreciation, total_reactions)
+        SELECT p.id,
+               count(r.id) FILTER (WHERE r.type = 'like'),
+               count(r.id) FILTER (WHERE r.type = 'praise'),
+               count(r.id) FILTER (WHERE r.type = 'empathy'),
+               count(r.id) FILTER (WHERE r.type = 'interest'),
+               count(r.id) FILTER (WHERE r.type = 'appreciation'),
+               count(r.id)
+        FROM post p
+        LEFT JOIN reaction r ON r.post_id = p.id
+        GROUP BY p.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('post_reaction_counts')
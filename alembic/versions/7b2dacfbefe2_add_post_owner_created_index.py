@@ -0,0 +1,28 @@
+"""Add (owner_id, created_at, id) index for keyset-paginated post listing
+
+Revision ID: 7b2dacfbefe2
+Revises: 95b37a2973d2
+Create Date: 2026-10-18 12:04:51.220938
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2dacfbefe2'
+down_revision: Union[str, None] = '95b37a2973d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.create_index('ix_post_owner_created', ['owner_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_owner_created')
@@ -0,0 +1,30 @@
+"""Add publishing/failed post statuses and publish_claimed_at
+
+Revision ID: 95b37a2973d2
+Revises: 9d52282b24c4
+Create Date: 2026-10-18 11:20:13.906412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '95b37a2973d2'
+down_revision: Union[str, None] = '9d52282b24c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TYPE post_status ADD VALUE IF NOT EXISTS 'publishing' BEFORE 'published'")
+    op.execute("ALTER TYPE post_status ADD VALUE IF NOT EXISTS 'failed' AFTER 'published'")
+    op.add_column('post', sa.Column('publish_claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    # Postgres cannot drop enum values; fold the new states back into existing ones.
+    op.execute("UPDATE post SET status = 'scheduled' WHERE status::text IN ('publishing', 'failed')")
+    op.drop_column('post', 'publish_claimed_at')
@@ -0,0 +1,41 @@
+"""Denormalize owner_id into post_reaction_counts and add ranking indexes
+
+Revision ID: 9d52282b24c4
+Revises: 23e16994421b
+Create Date: 2026-10-18 10:02:41.730116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d52282b24c4'
+down_revision: Union[str, None] = '23e16994421b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('post_reaction_counts', sa.Column('owner_id', sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE post_reaction_counts c
+        SET owner_id = p.owner_id
+        FROM post p
+        WHERE p.id = c.post_id
+        """
+    )
+    op.alter_column('post_reaction_counts', 'owner_id', nullable=False)
+    with op.batch_alter_table('post_reaction_counts', schema=None) as batch_op:
+        batch_op.create_index('ix_post_reaction_counts_rank', ['total_reactions', 'post_id'], unique=False)
+        batch_op.create_index('ix_post_reaction_counts_owner_rank', ['owner_id', 'total_reactions', 'post_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('post_reaction_counts', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_reaction_counts_owner_rank')
+        batch_op.drop_index('ix_post_reaction_counts_rank')
+    op.drop_column('post_reaction_counts', 'owner_id')
@@ -0,0 +1,37 @@
+"""Add version stamp to post_reaction_counts for analytics ETags
+
+Revision ID: c3a81f5e07d4
+Revises: 1582811aad7c
+Create Date: 2026-10-18 13:02:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a81f5e07d4'
+down_revision: Union[str, None] = '1582811aad7c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('post_reaction_counts_version_seq')))
+    op.add_column(
+        'post_reaction_counts',
+        sa.Column('version', sa.BigInteger(), server_default=sa.text("nextval('post_reaction_counts_version_seq')"), nullable=False),
+    )
+    with op.batch_alter_table('post_reaction_counts', schema=None) as batch_op:
+        batch_op.create_index('ix_post_reaction_counts_version', ['version'], unique=False)
+        batch_op.create_index('ix_post_reaction_counts_owner_version', ['owner_id', 'version'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('post_reaction_counts', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_reaction_counts_owner_version')
+        batch_op.drop_index('ix_post_reaction_counts_version')
+    op.drop_column('post_reaction_counts', 'version')
+    op.execute(sa.schema.DropSequence(sa.Sequence('post_reaction_counts_version_seq')))
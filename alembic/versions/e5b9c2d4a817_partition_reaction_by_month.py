@@ -0,0 +1,102 @@
+"""Partition reaction by month on created_at
+
+Revision ID: e5b9c2d4a817
+Revises: c3a81f5e07d4
+Create Date: 2026-10-18 14:21:09.640215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b9c2d4a817'
+down_revision: Union[str, None] = 'c3a81f5e07d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_reaction_created_at', ['created_at']),
+    ('ix_reaction_post_id', ['post_id']),
+    ('ix_reaction_post_type', ['post_id', 'type']),
+    ('ix_reaction_type', ['type']),
+]
+
+# One partition per month from the oldest reaction through three months ahead; later
+# months are created by the partition maintenance job (app.services.partitions).
+CREATE_MONTHLY_PARTITIONS = """
+DO $$
+DECLARE
+    month timestamp;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', timezone('UTC', coalesce((SELECT min(created_at) FROM reaction_legacy), now()))),
+            date_trunc('month', timezone('UTC', now())) + interval '3 months',
+            interval '1 month'
+        )
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF reaction FOR VALUES FROM (%L) TO (%L)',
+            'reaction_p' || to_char(month, 'YYYY_MM'),
+            timezone('UTC', month),
+            timezone('UTC', month + interval '1 month')
+        );
+    END LOOP;
+END $$;
+"""
+
+
+def upgrade() -> None:
+    # Keep the id sequence alive while the old table is dropped.
+    op.execute("ALTER SEQUENCE reaction_id_seq OWNED BY NONE")
+    op.rename_table('reaction', 'reaction_legacy')
+    op.execute("ALTER INDEX reaction_pkey RENAME TO reaction_legacy_pkey")
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name='reaction_legacy')
+
+    # The partition key has to be part of the primary key.
+    op.execute(
+        """
+        CREATE TABLE reaction (
+            id integer NOT NULL DEFAULT nextval('reaction_id_seq'),
+            post_id integer NOT NULL REFERENCES post (id) ON DELETE CASCADE,
+            type reaction_type NOT NULL,
+            created_at timestamptz NOT NULL,
+            CONSTRAINT reaction_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute(CREATE_MONTHLY_PARTITIONS)
+    # Catches rows outside every monthly range (e.g. bulk imports with odd timestamps).
+    op.execute("CREATE TABLE reaction_default PARTITION OF reaction DEFAULT")
+    for name, columns in INDEXES:
+        op.create_index(name, 'reaction', columns, unique=False)
+
+    op.execute("INSERT INTO reaction (id, post_id, type, created_at) SELECT id, post_id, type, created_at FROM reaction_legacy")
+    op.drop_table('reaction_legacy')
+    op.execute("ALTER SEQUENCE reaction_id_seq OWNED BY reaction.id")
+
+
+def downgrade() -> None:
+    op.execute("ALTER SEQUENCE reaction_id_seq OWNED BY NONE")
+    op.rename_table('reaction', 'reaction_partitioned')
+    op.execute("ALTER INDEX reaction_pkey RENAME TO reaction_partitioned_pkey")
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name='reaction_partitioned')
+
+    op.create_table('reaction',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('reaction_id_seq')"), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.Enum('like', 'praise', 'empathy', 'interest', 'appreciation', name='reaction_type', create_type=False), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['post.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO reaction (id, post_id, type, created_at) SELECT id, post_id, type, created_at FROM reaction_partitioned")
+    op.drop_table('reaction_partitioned')
+    for name, columns in INDEXES:
+        op.create_index(name, 'reaction', columns, unique=False)
+    op.execute("ALTER SEQUENCE reaction_id_seq OWNED BY reaction.id")
@@ -0,0 +1,198 @@
+"""Admission control: per-route-class concurrency limits with bounded, deadline-aware queues.
+
+Requests are classed by method and path before routing:
+- ``auth``: login and signup, which are CPU-bound on bcrypt
+- ``write``: single reactions
+- ``heavy``: ranking, listing and bulk endpoints
+
+Each class runs at most ``limit`` requests at once, and the rest wait in FIFO order.
+A request is refused up front with ``503`` and ``Retry-After`` in two cases:
+- its class's queue is full
+- the queue wait it can expect (rounds of ``limit`` requests ahead of it times the
+  class's recent service time) already exceeds the class's wait target
+
+A request that is admitted to the queue but not served within the target gets the same
+503. Shedding at the door keeps the latency of the requests that are served bounded
+instead of letting every queue grow until requests time out together. Unclassed routes
+(point reads, CRUD, the export stream, health, metrics) are not limited.
+"""
+import asyncio
+from collections import deque
+import math
+import re
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+from app.core.serialization import dumps
+
+# Weight of the newest sample in each class's moving average of service time.
+SERVICE_TIME_ALPHA = 0.2
+
+ROUTE_CLASSES: list[tuple[str, str, re.Pattern]] = [
+    ("auth", "POST", re.compile(r"^/auth/(login|signup)/?$")),
+    ("write", "POST", re.compile(r"^/analytics/\d+/react/?$")),
+    ("heavy", "GET", re.compile(r"^/analytics/(top|posts)/?$")),
+    ("heavy", "GET", re.compile(r"^/analytics/post/\d+/timeseries/?$")),
+    ("heavy", "GET", re.compile(r"^/posts/?$")),
+    ("heavy", "POST", re.compile(r"^/posts/bulk/?$")),
+    ("heavy", "POST", re.compile(r"^/analytics/reactions/bulk/?$")),
+]
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    for name, route_method, pattern in ROUTE_CLASSES:
+        if method == route_method and pattern.match(path):
+            return name
+    return None
+
+
+class Gate:
+    """Concurrency limit for one route class, with a bounded FIFO queue in front of it."""
+
+    def __init__(self, name: str, limit: int, max_queue: int, target_seconds: float) -> None:
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.target = target_seconds
+        self.active = 0
+        self.service_seconds = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def expected_wait(self) -> float:
+        # A newcomer is served after ``ceil(position / limit)`` rounds of in-flight requests.
+        return math.ceil((len(self._waiters) + 1) / self.limit) * self.service_seconds
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.expected_wait()))
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot; returns None once admitted, or the reason the request was shed."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return "queue_full"
+        if self.expected_wait() > self.target:
+            return "expected_wait"
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.target)
+        except asyncio.TimeoutError:
+            self._give_up(waiter)
+            return "wait_timeout"
+        except asyncio.CancelledError:
+            # The client went away.
+            self._give_up(waiter)
+            raise
+        finally:
+            ADMISSION_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - started, self.name)
+        return None
+
+    def _give_up(self, waiter: asyncio.Future) -> None:
+        # If ``release`` handed this waiter a slot just before it gave up, pass it on.
+        if waiter.done() and not waiter.cancelled():
+            self.release()
+        else:
+            self._discard(waiter)
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, service_seconds: Optional[float] = None) -> None:
+        if service_seconds is not None:
+            self.service_seconds += SERVICE_TIME_ALPHA * (service_seconds - self.service_seconds)
+        # Hand the slot straight to the next live waiter, so ``active`` never drops below
+        # the limit while requests are queued.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+ADMISSION_QUEUE_WAIT_SECONDS = Histogram(
+    "admission_queue_wait_seconds",
+    "Time queued requests waited for an admission slot.",
+    ("route_class",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+ADMISSION_REJECTED = Counter("admission_rejected_total", "Requests shed with 503 by admission control.", ("route_class", "reason"))
+
+
+def _gates() -> dict[str, Gate]:
+    limits = {
+        "auth": (settings.admission_auth_concurrency, settings.admission_auth_queue_target_ms),
+        "write": (settings.admission_write_concurrency, settings.admission_queue_target_ms),
+        "heavy": (settings.admission_heavy_concurrency, settings.admission_queue_target_ms),
+    }
+    return {
+        name: Gate(name, limit, settings.admission_max_queue, target_ms / 1000)
+        for name, (limit, target_ms) in limits.items()
+        if limit > 0
+    }
+
+
+GATES = _gates()
+Gauge(
+    "admission_active_requests",
+    "Requests holding an admission slot.",
+    ("route_class",),
+    callback=lambda: {(name,): gate.active for name, gate in GATES.items()},
+)
+Gauge(
+    "admission_queued_requests",
+    "Requests waiting for an admission slot.",
+    ("route_class",),
+    callback=lambda: {(name,): gate.queued for name, gate in GATES.items()},
+)
+
+
+class AdmissionControlMiddleware:
+    """Pure ASGI middleware applying the per-class ``Gate`` limits in ``GATES``."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        gate = None
+        if scope["type"] == "http":
+            gate = GATES.get(route_class(scope["method"], scope["path"]))
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+        reason = await gate.acquire()
+        if reason is not None:
+            ADMISSION_REJECTED.inc(gate.name, reason)
+            await _busy(send, gate.retry_after())
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release(time.perf_counter() - started)
+
+
+async def _busy(send, retry_after: int) -> None:
+    body = dumps({"detail": "Server is busy, retry later"})
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
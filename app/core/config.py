@@ -1,12 +1,64 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
 
 class Settings(BaseSettings):
     database_url: str = Field(alias="DATABASE_URL")
+    read_database_url: Optional[str] = Field(default=None, alias="READ_DATABASE_URL")
+    db_pool_size: int = Field(default=10, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=20, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(default=30.0, alias="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_recycle_seconds: int = Field(default=1800, alias="DB_POOL_RECYCLE_SECONDS")
+    db_pool_pre_ping: bool = Field(default=True, alias="DB_POOL_PRE_PING")
+    db_statement_timeout_ms: int = Field(default=30000, alias="DB_STATEMENT_TIMEOUT_MS")
     secret_key: str = Field(alias="SECRET_KEY")
     algorithm: str = Field(default="HS256", alias="ALGORITHM")
     access_token_expire_minutes: int = Field(default=60, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
+    bcrypt_rounds: int = Field(default=12, alias="BCRYPT_ROUNDS")
+    bcrypt_pool_workers: int = Field(default=0, alias="BCRYPT_POOL_WORKERS")
+    bcrypt_max_queue: int = Field(default=256, alias="BCRYPT_MAX_QUEUE")
+    user_cache_max_size: int = Field(default=10000, alias="USER_CACHE_MAX_SIZE")
+    user_cache_ttl_seconds: float = Field(default=60.0, alias="USER_CACHE_TTL_SECONDS")
+    scheduler_reconcile_seconds: int = Field(default=30, alias="SCHEDULER_RECONCILE_SECONDS")
+    scheduler_horizon_seconds: int = Field(default=120, alias="SCHEDULER_HORIZON_SECONDS")
+    scheduler_claim_batch_size: int = Field(default=100, alias="SCHEDULER_CLAIM_BATCH_SIZE")
+    scheduler_in_web_process: bool = Field(default=False, alias="SCHEDULER_IN_WEB_PROCESS")
+    publish_workers: int = Field(default=32, alias="PUBLISH_WORKERS")
+    publish_max_attempts: int = Field(default=5, alias="PUBLISH_MAX_ATTEMPTS")
+    publish_timeout_seconds: float = Field(default=10.0, alias="PUBLISH_TIMEOUT_SECONDS")
+    publish_backoff_seconds: float = Field(default=0.5, alias="PUBLISH_BACKOFF_SECONDS")
+    publish_backoff_max_seconds: float = Field(default=30.0, alias="PUBLISH_BACKOFF_MAX_SECONDS")
+    publish_claim_timeout_seconds: int = Field(default=300, alias="PUBLISH_CLAIM_TIMEOUT_SECONDS")
+    sql_slow_query_ms: int = Field(default=500, alias="SQL_SLOW_QUERY_MS")
+    sql_query_budget_enforce: bool = Field(default=False, alias="SQL_QUERY_BUDGET_ENFORCE")
+    metrics_enabled: bool = Field(default=True, alias="METRICS_ENABLED")
+    admission_control_enabled: bool = Field(default=True, alias="ADMISSION_CONTROL_ENABLED")
+    admission_auth_concurrency: int = Field(default=16, alias="ADMISSION_AUTH_CONCURRENCY")
+    admission_write_concurrency: int = Field(default=64, alias="ADMISSION_WRITE_CONCURRENCY")
+    admission_heavy_concurrency: int = Field(default=32, alias="ADMISSION_HEAVY_CONCURRENCY")
+    admission_max_queue: int = Field(default=128, alias="ADMISSION_MAX_QUEUE")
+    admission_queue_target_ms: int = Field(default=250, alias="ADMISSION_QUEUE_TARGET_MS")
+    admission_auth_queue_target_ms: int = Field(default=2000, alias="ADMISSION_AUTH_QUEUE_TARGET_MS")
+    analytics_cache_max_size: int = Field(default=10000, alias="ANALYTICS_CACHE_MAX_SIZE")
+    analytics_cache_ttl_seconds: int = Field(default=60, alias="ANALYTICS_CACHE_TTL_SECONDS")
+    analytics_top_max_staleness_seconds: int = Field(default=5, alias="ANALYTICS_TOP_MAX_STALENESS_SECONDS")
+    rollup_interval_seconds: int = Field(default=60, alias="ROLLUP_INTERVAL_SECONDS")
+    rollup_batch_size: int = Field(default=100000, alias="ROLLUP_BATCH_SIZE")
+    reaction_partition_months_ahead: int = Field(default=3, alias="REACTION_PARTITION_MONTHS_AHEAD")
+    reaction_retention_months: int = Field(default=0, alias="REACTION_RETENTION_MONTHS")
+    reaction_retention_drop: bool = Field(default=True, alias="REACTION_RETENTION_DROP")
+    engagement_index_enabled: bool = Field(default=False, alias="ENGAGEMENT_INDEX_ENABLED")
+    engagement_index_top_k: int = Field(default=1000, alias="ENGAGEMENT_INDEX_TOP_K")
+    engagement_index_reconcile_seconds: int = Field(default=300, alias="ENGAGEMENT_INDEX_RECONCILE_SECONDS")
+    reaction_buffer_enabled: bool = Field(default=False, alias="REACTION_BUFFER_ENABLED")
+    reaction_buffer_max_size: int = Field(default=10000, alias="REACTION_BUFFER_MAX_SIZE")
+    reaction_buffer_batch_size: int = Field(default=500, alias="REACTION_BUFFER_BATCH_SIZE")
+    reaction_buffer_flush_interval_ms: int = Field(default=200, alias="REACTION_BUFFER_FLUSH_INTERVAL_MS")
+    reaction_buffer_put_timeout_ms: int = Field(default=0, alias="REACTION_BUFFER_PUT_TIMEOUT_MS")
+    reaction_buffer_flush_attempts: int = Field(default=5, alias="REACTION_BUFFER_FLUSH_ATTEMPTS")
+    reaction_buffer_retry_backoff_ms: int = Field(default=200, alias="REACTION_BUFFER_RETRY_BACKOFF_MS")
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,151 @@
+"""Per-request SQL accounting: query count, DB time, slow-query log and query budgets.
+
+Engine events (registered in ``app.db.session``) add to the ``QueryStats`` of the
+current request, found through a context variable that ``QueryStatsMiddleware`` sets.
+Queries issued outside a request (scheduler jobs) only go through the slow-query log.
+"""
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import json
+import logging
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+request_logger = logging.getLogger("app.requests")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+@dataclass
+class QueryStats:
+    queries: int = 0
+    seconds: float = 0.0
+    budget: Optional[int] = None
+    statements: Counter = field(default_factory=Counter)
+
+    def top_repeat(self) -> int:
+        return max(self.statements.values(), default=0)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def query_budget(limit: int):
+    """Route dependency capping the queries a request may issue, e.g.
+    ``dependencies=[Depends(query_budget(2))]``.
+
+    Over-budget requests are logged; with ``SQL_QUERY_BUDGET_ENFORCE`` the query that
+    crosses the limit raises ``QueryBudgetExceeded`` instead, failing the request.
+    """
+
+    def set_budget() -> None:
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = limit
+
+    return set_budget
+
+
+def _params_shape(parameters: Any, executemany: bool) -> str:
+    """Describe bound parameters by type only, so the slow-query log never records values."""
+    if executemany and parameters:
+        return f"{len(parameters)} x {_params_shape(parameters[0], False)}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.statements[statement] += 1
+        if settings.sql_query_budget_enforce and stats.budget is not None and stats.queries > stats.budget:
+            raise QueryBudgetExceeded(f"Query budget of {stats.budget} exceeded by: {statement[:200]}")
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - context._query_started
+    stats = _current.get()
+    if stats is not None:
+        stats.seconds += elapsed
+    if settings.sql_slow_query_ms and elapsed * 1000 >= settings.sql_slow_query_ms:
+        logger.warning(
+            "Slow query (%.1f ms): %s | params %s",
+            elapsed * 1000,
+            " ".join(statement.split())[:2000],
+            _params_shape(parameters, executemany),
+        )
+
+
+def install_query_events(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware that scopes ``QueryStats`` to a request.
+
+    Adds a ``Server-Timing`` header (``db`` and ``app`` durations) to the response and
+    logs one JSON line per request on the ``app.requests`` logger. Queries run while a
+    streaming body is sent count towards the log line but not the header.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = (
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.queries} queries", '
+                    f"app;dur={(time.perf_counter() - started) * 1000:.1f}"
+                )
+                message.setdefault("headers", []).append((b"server-timing", timing.encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            over_budget = stats.budget is not None and stats.queries > stats.budget
+            if over_budget:
+                logger.warning("%s %s issued %d queries (budget %d)", scope["method"], route, stats.queries, stats.budget)
+            if request_logger.isEnabledFor(logging.INFO):
+                request_logger.info(json.dumps({
+                    "method": scope["method"],
+                    "route": route,
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "db_queries": stats.queries,
+                    "db_ms": round(stats.seconds * 1000, 2),
+                    "db_top_repeat": stats.top_repeat(),
+                    "over_budget": over_budget,
+                }))
@@ -1,29 +1,101 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import multiprocessing
+import os
 from typing import Any, Optional
 
-from jose import jwt, JWTError
-from passlib.context import CryptContext
-
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# jose and passlib/bcrypt are imported on first use rather than at module import, so
+# they stay off the cold-start path until a request needs them.
+
+_hash_pool: ProcessPoolExecutor | None = None
+_hash_capacity = 0
+_hash_pending = 0
+
+
+class HashPoolBusy(RuntimeError):
+    """The bcrypt pool already has ``workers + BCRYPT_MAX_QUEUE`` calls queued or running."""
+
+
+@lru_cache(maxsize=None)
+def _pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
 
 def create_access_token(subject: str, role: str, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.access_token_expire_minutes))
     to_encode: dict[str, Any] = {"sub": subject, "exp": expire, "role": role}
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Verify a password and, if its hash uses an outdated cost, return a fresh hash too."""
+    return _pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool, _hash_capacity
+    if _hash_pool is None:
+        workers = settings.bcrypt_pool_workers or os.cpu_count() or 1
+        # spawn, not fork: the parent runs an event loop and DB pool threads that must not be cloned.
+        _hash_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        _hash_capacity = workers + settings.bcrypt_max_queue
+    return _hash_pool
+
+
+async def _run_in_hash_pool(fn, *args):
+    """Run ``fn`` on the bcrypt pool, or raise ``HashPoolBusy`` when its queue is full."""
+    global _hash_pending
+    pool = _get_hash_pool()
+    if _hash_pending >= _hash_capacity:
+        raise HashPoolBusy("bcrypt pool queue is full")
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """``get_password_hash`` on the bcrypt process pool, keeping the event loop free."""
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """``verify_and_update_password`` on the bcrypt process pool."""
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+
+def hash_pool_pending() -> int:
+    """Hash/verify calls submitted to the pool and not yet finished, including queued ones."""
+    return _hash_pending
+
+
+def shutdown_hash_pool() -> None:
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=True, cancel_futures=True)
+        _hash_pool = None
 
 
 def decode_token(token: str) -> dict[str, Any]:
+    from jose import JWTError, jwt
+
     try:
         return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
     except JWTError as exc:
@@ -0,0 +1,33 @@
+"""orjson-backed JSON rendering.
+
+``FastJSONResponse`` is the app's default response class. Routes that keep a
+``response_model`` still validate through Pydantic, and only the final encoding moves
+to orjson. Hot routes can skip the models entirely by returning
+``FastJSONResponse(...)`` built from SQL result rows with ``rows_as_dicts``; their
+``response_model`` then only documents the schema. orjson renders datetimes, enums and
+ints the same way Pydantic does, so the wire format does not change.
+"""
+from typing import Any, Iterable, Sequence
+
+from fastapi.responses import ORJSONResponse
+import orjson
+
+# OPT_UTC_Z writes UTC offsets as "Z", matching Pydantic's datetime serialization.
+DUMPS_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=DUMPS_OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def rows_as_dicts(rows: Sequence, fields: Iterable[str] | None = None) -> list[dict]:
+    """SQL result rows as dicts keyed by column label; the labels are read once, not per row."""
+    if not rows:
+        return []
+    keys = tuple(fields) if fields is not None else rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
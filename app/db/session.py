@@ -1,15 +1,118 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+from typing import Callable
+
+from fastapi import Depends
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import Histogram
+from app.core.query_stats import install_query_events
+
+POOL_WAIT_SECONDS = Histogram("db_pool_wait_seconds", "Time to obtain a connection from the SQLAlchemy pool.")
+
+
+def _async_url(url: str) -> str:
+    """Point a ``postgresql[+driver]://`` URL at the asyncpg driver."""
+    parsed = make_url(url)
+    if parsed.drivername in {"postgres", "postgresql", "postgresql+psycopg2"}:
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited (including connecting)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
+def _make_engine(url: str) -> AsyncEngine:
+    url = _async_url(url)
+    connect_args = {}
+    if make_url(url).get_backend_name() == "postgresql" and settings.db_statement_timeout_ms:
+        # Sent as a startup parameter, so it costs no extra round trip per connection.
+        connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+    async_engine = create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
+    )
+    install_query_events(async_engine.sync_engine)
+    return async_engine
+
+
+_engines: dict[str, AsyncEngine] = {}
+
+
+def get_engine() -> AsyncEngine:
+    """The primary engine, created on first use so importing the app opens nothing."""
+    engine = _engines.get("primary")
+    if engine is None:
+        engine = _engines["primary"] = _make_engine(settings.database_url)
+    return engine
+
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_read_engine() -> AsyncEngine:
+    """Engine for read-only endpoints: the replica when READ_DATABASE_URL is set, the primary otherwise."""
+    if not settings.read_database_url:
+        return get_engine()
+    engine = _engines.get("replica")
+    if engine is None:
+        engine = _engines["replica"] = _make_engine(settings.read_database_url)
+    return engine
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+def created_engines() -> dict[str, AsyncEngine]:
+    """Engines created so far, by role (``primary``, ``replica``)."""
+    return dict(_engines)
+
+
+class _LazySessionmaker:
+    """``async_sessionmaker`` that binds to its engine on the first session."""
+
+    def __init__(self, get_bind: Callable[[], AsyncEngine]) -> None:
+        self._get_bind = get_bind
+        self._maker: async_sessionmaker | None = None
+
+    def __call__(self, **kw) -> AsyncSession:
+        if self._maker is None:
+            self._maker = async_sessionmaker(self._get_bind(), class_=AsyncSession, autoflush=False, expire_on_commit=False)
+        return self._maker(**kw)
+
+
+SessionLocal = _LazySessionmaker(get_engine)
+ReadSessionLocal = _LazySessionmaker(get_read_engine)
+
+
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def get_read_db(primary: AsyncSession = Depends(get_db)):
+    """Session for endpoints that only read; may lag the primary by the replica's delay.
+
+    Without a replica this is the request's ``get_db`` session, so a request never
+    holds two connections from the primary pool.
+    """
+    if not settings.read_database_url:
+        yield primary
+        return
+    async with ReadSessionLocal() as db:
+        yield db
+
+
+async def dispose_engines() -> None:
+    for engine in _engines.values():
+        await engine.dispose()
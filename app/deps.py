@@ -1,7 +1,13 @@
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import decode_token
 from app.db.session import get_db
 from app.models.user import User, UserRole
@@ -9,7 +15,24 @@ from app.models.user import User, UserRole
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+@dataclass(frozen=True)
+class CurrentUser:
+    """The identity fields most routes need, resolvable without loading the ``User`` row."""
+
+    id: int
+    email: str
+    role: UserRole
+
+
+user_cache = TTLCache(maxsize=settings.user_cache_max_size, ttl=settings.user_cache_ttl_seconds)
+
+
+def invalidate_user(email: str) -> None:
+    """Drop a cached identity, e.g. after changing ``User`` rows with a bulk statement."""
+    user_cache.pop(email)
+
+
+async def get_current_identity(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> CurrentUser:
     try:
         payload = decode_token(token)
     except ValueError:
@@ -17,13 +40,55 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     email = payload.get("sub")
     if not email:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    identity = user_cache.get(email)
+    if identity is None:
+        row = (await db.execute(select(User.id, User.email, User.role).where(User.email == email))).first()
+        if not row:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        identity = CurrentUser(id=row.id, email=row.email, role=row.role)
+        user_cache.set(email, identity)
+        # End the lookup's transaction so its connection goes back to the pool before
+        # the route takes one (from the replica pool, for read routes).
+        await db.commit()
+    return identity
 
 
-def require_admin(user: User = Depends(get_current_user)) -> User:
+async def require_admin(user: CurrentUser = Depends(get_current_identity)) -> CurrentUser:
     if user.role != UserRole.admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
     return user
+
+
+def _mark_stale(session: Session, email: str) -> None:
+    session.info.setdefault("stale_user_emails", set()).add(email)
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    email_history = state.attrs.email.history
+    if state.attrs.role.history.has_changes() or email_history.has_changes():
+        session = state.session
+        if session is not None:
+            for email in [*email_history.deleted, target.email]:
+                _mark_stale(session, email)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target: User) -> None:
+    session = inspect(target).session
+    if session is not None:
+        _mark_stale(session, target.email)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_stale_users(session: Session) -> None:
+    # Evict only once the change is visible to other sessions, so a concurrent request
+    # cannot re-cache the old role between flush and commit.
+    for email in session.info.pop("stale_user_emails", ()):
+        invalidate_user(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_users(session: Session) -> None:
+    session.info.pop("stale_user_emails", None)
@@ -1,11 +1,30 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import auth, posts, analytics
+from app.core.admission import AdmissionControlMiddleware
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.serialization import FastJSONResponse
+from app.core.security import shutdown_hash_pool
+from app.db.session import dispose_engines
+from app.routers import auth, posts, analytics, metrics
+from app.services.engagement_index import engagement_index_startup, engagement_index_shutdown
+from app.services.reaction_buffer import buffer_startup, buffer_shutdown
 from app.services.scheduler import scheduler_startup, scheduler_shutdown
 
-app = FastAPI(title="LinkedIn Analytics Backend", version="1.0.0")
+app = FastAPI(title="LinkedIn Analytics Backend", version="2.0.0", default_response_class=FastJSONResponse)
 
+app.add_middleware(QueryStatsMiddleware)
+
+if settings.admission_control_enabled:
+    app.add_middleware(AdmissionControlMiddleware)
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router, tags=["meta"])
+
+# Added last so it is outermost: admission 503s carry CORS headers too.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -41,9 +60,16 @@ def health() -> dict:
     return {"status": "ok"}
 
 @app.on_event("startup")
-def on_startup() -> None:
-    scheduler_startup()
+async def on_startup() -> None:
+    buffer_startup()
+    engagement_index_startup()
+    if settings.scheduler_in_web_process:
+        scheduler_startup()
 
 @app.on_event("shutdown")
-def on_shutdown() -> None:
-    scheduler_shutdown()
+async def on_shutdown() -> None:
+    await buffer_shutdown()
+    await engagement_index_shutdown()
+    await scheduler_shutdown()
+    shutdown_hash_pool()
+    await dispose_engines()
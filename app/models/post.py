@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import String, DateTime, ForeignKey, Enum as PgEnum, Index, Integer
+from sqlalchemy import BigInteger, String, DateTime, ForeignKey, Enum as PgEnum, Index, Integer, Sequence
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -9,7 +9,9 @@ from app.db.base import Base
 class PostStatus(str, Enum):
     draft = "draft"
     scheduled = "scheduled"
+    publishing = "publishing"
     published = "published"
+    failed = "failed"
 
 
 class ReactionType(str, Enum):
@@ -28,27 +30,74 @@ class Post(Base):
     scheduled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), index=True)
     scheduled_second: Mapped[int | None] = mapped_column(Integer)
     published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    publish_claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
 
     owner = relationship("User", back_populates="posts")
-    reactions = relationship("Reaction", back_populates="post", cascade="all,delete")
+    reactions = relationship("Reaction", back_populates="post", cascade="all,delete", passive_deletes=True)
+    reaction_counts = relationship("PostReactionCount", back_populates="post", cascade="all,delete", passive_deletes=True, uselist=False)
 
     __table_args__ = (
         Index("ix_post_owner_status_time", "owner_id", "status", "scheduled_at"),
         Index("ix_post_scheduled_status", "scheduled_at", "status"),
         Index("ix_post_created_at", "created_at"),
+        Index("ix_post_owner_created", "owner_id", "created_at", "id"),
     )
 
 
+REACTION_ID_SEQ = Sequence("reaction_id_seq")
+
+
 class Reaction(Base):
-    id: Mapped[int] = mapped_column(primary_key=True)
+    """Append-only reaction log, range-partitioned by month on ``created_at``.
+
+    Postgres requires the partition key in the primary key, hence ``(id, created_at)``;
+    partitions are created ahead of time and expired by ``app.services.partitions``.
+    """
+
+    id: Mapped[int] = mapped_column(Integer, REACTION_ID_SEQ, primary_key=True, server_default=REACTION_ID_SEQ.next_value())
     post_id: Mapped[int] = mapped_column(ForeignKey("post.id", ondelete="CASCADE"), index=True, nullable=False)
     type: Mapped[ReactionType] = mapped_column(PgEnum(ReactionType, name="reaction_type"), index=True, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, primary_key=True, nullable=False)
 
     post = relationship("Post", back_populates="reactions")
 
     __table_args__ = (
         Index("ix_reaction_post_type", "post_id", "type"),
         Index("ix_reaction_created_at", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+REACTION_COUNTS_VERSION_SEQ = Sequence("post_reaction_counts_version_seq")
+
+
+class PostReactionCount(Base):
+    """Denormalized per-post reaction totals, maintained alongside ``Reaction`` inserts.
+
+    ``version`` is taken from a shared sequence on every change, so it identifies the row
+    state and ``max(version)`` over a set of rows moves whenever any of them changes.
+    """
+
+    __tablename__ = "post_reaction_counts"
+
+    post_id: Mapped[int] = mapped_column(ForeignKey("post.id", ondelete="CASCADE"), primary_key=True)
+    owner_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    like: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    praise: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    empathy: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    interest: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    appreciation: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    total_reactions: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    version: Mapped[int] = mapped_column(
+        BigInteger, REACTION_COUNTS_VERSION_SEQ, server_default=REACTION_COUNTS_VERSION_SEQ.next_value(), nullable=False
+    )
+
+    post = relationship("Post", back_populates="reaction_counts")
+
+    __table_args__ = (
+        Index("ix_post_reaction_counts_rank", "total_reactions", "post_id"),
+        Index("ix_post_reaction_counts_owner_rank", "owner_id", "total_reactions", "post_id"),
+        Index("ix_post_reaction_counts_version", "version"),
+        Index("ix_post_reaction_counts_owner_version", "owner_id", "version"),
     )
@@ -0,0 +1,38 @@
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Enum as PgEnum, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.models.post import ReactionType
+
+
+class RollupGranularity(str, Enum):
+    hour = "hour"
+    day = "day"
+
+
+class ReactionRollup(Base):
+    """Reaction counts per post, time bucket and type, filled incrementally from ``reaction``."""
+
+    __tablename__ = "reaction_rollup"
+
+    post_id: Mapped[int] = mapped_column(ForeignKey("post.id", ondelete="CASCADE"), primary_key=True)
+    granularity: Mapped[RollupGranularity] = mapped_column(PgEnum(RollupGranularity, name="rollup_granularity"), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    type: Mapped[ReactionType] = mapped_column(PgEnum(ReactionType, name="reaction_type", create_type=False), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class RollupWatermark(Base):
+    """Progress of an aggregation job over ``reaction.id``.
+
+    ``last_reaction_id`` is the highest id already folded in; ``observed_max_id`` is the
+    highest id seen on the previous run, which becomes the next run's target.
+    """
+
+    __tablename__ = "rollup_watermark"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_reaction_id: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    observed_max_id: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
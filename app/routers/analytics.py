@@ -1,21 +1,39 @@
-from collections import defaultdict
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-
-from app.db.session import get_db
-from app.deps import get_current_user
-from app.models.user import User, UserRole
-from app.models.post import Post, Reaction, ReactionType
-from app.schemas.analytics import PostMetric, TopPostsResponse
+from datetime import datetime, timedelta, timezone
+import json
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, tuple_
+
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.query_stats import query_budget
+from app.core.serialization import FastJSONResponse, dumps, rows_as_dicts
+from app.db.session import get_db, get_read_db
+from app.deps import CurrentUser, get_current_identity
+from app.models.user import UserRole
+from app.models.post import Post, PostReactionCount, Reaction, ReactionType
+from app.models.rollup import ReactionRollup, RollupGranularity
+from app.schemas.analytics import BulkReactionResult, PostMetric, PostMetricColumns, ReactionIn, TimeseriesResponse, TopPostsResponse
+from app.services.analytics_cache import cached_body, etag_matches, json_response, make_etag, not_modified, store_body
+from app.services.engagement_index import get_engagement_index
+from app.services.export import EXPORT_COLUMNS, metric_columns, metrics_export_query, stream_csv, stream_parquet
+from app.services.reaction_buffer import get_reaction_buffer
+from app.services.reactions import bump_reaction_counts, insert_reactions
 
 router = APIRouter()
 
+MAX_BULK_REACTIONS = 100_000
+MAX_TIMESERIES_BUCKETS = 24 * 366
+MAX_BATCH_METRIC_IDS = 1000
+
 
-@router.post("/{post_id}/react")
-def react(post_id: int, type: str, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    post = db.query(Post).filter(Post.id == post_id).first()
+@router.post("/{post_id}/react", dependencies=[Depends(query_budget(4))])
+async def react(post_id: int, type: str, db: AsyncSession = Depends(get_db), user: CurrentUser = Depends(get_current_identity)):
+    post = await db.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     if user.role != UserRole.admin and post.owner_id != user.id:
@@ -24,65 +42,327 @@ def react(post_id: int, type: str, db: Session = Depends(get_db), user: User = D
         rtype = ReactionType(type)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid reaction type")
+    buffer = get_reaction_buffer()
+    if buffer is not None:
+        if not await buffer.submit(post.id, post.owner_id, rtype, datetime.now(timezone.utc)):
+            raise HTTPException(status_code=429, detail="Reaction queue is full, retry later", headers={"Retry-After": "1"})
+        return {"status": "queued"}
     reaction = Reaction(post_id=post.id, type=rtype)
     db.add(reaction)
-    db.commit()
+    await bump_reaction_counts(db, {(post.id, rtype): 1}, {post.id: post.owner_id})
+    await db.commit()
     return {"status": "ok"}
 
 
-def _metrics_for_posts(db: Session, post_ids: list[int]) -> dict[int, PostMetric]:
-    counts = (
-        db.query(Reaction.post_id, Reaction.type, func.count(Reaction.id))
-        .filter(Reaction.post_id.in_(post_ids))
-        .group_by(Reaction.post_id, Reaction.type)
-        .all()
-    )
-    by_post: dict[int, dict[str, int]] = defaultdict(lambda: defaultdict(int))
-    for pid, rtype, cnt in counts:
-        by_post[pid][rtype.value] = cnt
-    metrics: dict[int, PostMetric] = {}
-    for pid in post_ids:
-        like = by_post[pid].get("like", 0)
-        praise = by_post[pid].get("praise", 0)
-        empathy = by_post[pid].get("empathy", 0)
-        interest = by_post[pid].get("interest", 0)
-        appreciation = by_post[pid].get("appreciation", 0)
-        total_reactions = like + praise + empathy + interest + appreciation
-        impressions = total_reactions * 10
-        comments = total_reactions // 3
-        shares = total_reactions // 5
-        metrics[pid] = PostMetric(
-            post_id=pid,
-            total_reactions=total_reactions,
-            like=like,
-            praise=praise,
-            empathy=empathy,
-            interest=interest,
-            appreciation=appreciation,
-            impressions=impressions,
-            comments=comments,
-            shares=shares,
+def _parse_bulk_body(body: bytes, content_type: str) -> list:
+    if "ndjson" in content_type:
+        return [line for line in body.decode().splitlines() if line.strip()]
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of reactions")
+    return items
+
+
+async def _ingest_reactions(db: AsyncSession, user: CurrentUser, items: list) -> dict:
+    errors: list[dict] = []
+    parsed: list[tuple[int, ReactionIn]] = []
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, str):
+                parsed.append((index, ReactionIn.model_validate_json(item)))
+            else:
+                parsed.append((index, ReactionIn.model_validate(item)))
+        except ValidationError as exc:
+            errors.append({"index": index, "detail": exc.errors(include_url=False)[0]["msg"]})
+
+    post_ids = {r.post_id for _, r in parsed}
+    owners: dict[int, int] = {}
+    if post_ids:
+        owners = {pid: owner_id for pid, owner_id in await db.execute(select(Post.id, Post.owner_id).where(Post.id.in_(post_ids)))}
+
+    now = datetime.now(timezone.utc)
+    rows: list[dict] = []
+    for index, r in parsed:
+        owner_id = owners.get(r.post_id)
+        if owner_id is None:
+            errors.append({"index": index, "detail": "Post not found"})
+        elif user.role != UserRole.admin and owner_id != user.id:
+            errors.append({"index": index, "detail": "Forbidden"})
+        else:
+            rows.append({"post_id": r.post_id, "type": r.type, "created_at": r.created_at or now})
+
+    inserted = await insert_reactions(db, rows, owners)
+    errors.sort(key=lambda e: e["index"])
+    return {"inserted": inserted, "errors": errors}
+
+
+@router.post("/reactions/bulk", response_model=BulkReactionResult)
+async def bulk_react(request: Request, db: AsyncSession = Depends(get_db), user: CurrentUser = Depends(get_current_identity)):
+    """Ingest many reactions at once from a JSON array or an NDJSON body (``application/x-ndjson``).
+
+    Ownership for every referenced post is checked with a single query and rows are
+    inserted in multi-row chunks; invalid rows are reported by index and skipped. The
+    valid rows are written in one transaction: if the request fails, none of them were
+    stored and it is safe to retry.
+    """
+    items = _parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    if len(items) > MAX_BULK_REACTIONS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_REACTIONS} reactions per request")
+    return await _ingest_reactions(db, user, items)
+
+
+@router.get("/post/{post_id}", response_model=PostMetric, dependencies=[Depends(query_budget(3))])
+async def post_metrics(post_id: int, request: Request, db: AsyncSession = Depends(get_read_db), user: CurrentUser = Depends(get_current_identity)):
+    """Metrics for one post, with an ETag taken from the counter row's version stamp.
+
+    A matching ``If-None-Match`` gets ``304`` and an unchanged post is served from the
+    response cache, so repeat polls cost a single indexed lookup. With the engagement
+    index enabled, posts it holds are answered from memory without a query.
+    """
+    index = get_engagement_index()
+    owner_id = index.owner_of(post_id) if index is not None else None
+    if owner_id is not None:
+        if user.role != UserRole.admin and owner_id != user.id:
+            raise HTTPException(status_code=403, detail="Forbidden")
+        body = dumps(index.metric(post_id))
+        etag = make_etag("post", post_id, body)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        return json_response(etag, body)
+
+    row = (
+        await db.execute(
+            select(Post.owner_id, PostReactionCount.version)
+            .outerjoin(PostReactionCount, PostReactionCount.post_id == Post.id)
+            .where(Post.id == post_id)
         )
-    return metrics
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if user.role != UserRole.admin and row.owner_id != user.id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    etag = make_etag("post", post_id, row.version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    key = ("post", post_id)
+    body = cached_body(key, etag)
+    if body is None:
+        metrics = (
+            await db.execute(
+                select(*metric_columns(Post.id))
+                .outerjoin(PostReactionCount, PostReactionCount.post_id == Post.id)
+                .where(Post.id == post_id)
+            )
+        ).one()
+        body = dumps(metrics._asdict())
+        store_body(key, etag, body)
+    return json_response(etag, body)
 
 
-@router.get("/post/{post_id}", response_model=PostMetric)
-def post_metrics(post_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    post = db.query(Post).filter(Post.id == post_id).first()
+def _parse_ids(ids: str) -> list[int]:
+    try:
+        parsed = sorted({int(v) for v in ids.split(",") if v.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(parsed) > MAX_BATCH_METRIC_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_METRIC_IDS} ids per request")
+    return parsed
+
+
+@router.get("/posts", response_model=PostMetricColumns, dependencies=[Depends(query_budget(2))])
+async def batch_post_metrics(
+    ids: Optional[str] = Query(default=None, description="Comma-separated post ids"),
+    owner_id: Optional[int] = None,
+    limit: int = Query(default=1000, ge=1, le=10000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: CurrentUser = Depends(get_current_identity),
+):
+    """Metrics for many posts in one statement, returned as parallel arrays.
+
+    With ``ids`` (at most ``MAX_BATCH_METRIC_IDS``) the listed posts are returned;
+    without it, every post of the caller (admins: every post, or ``owner_id``'s), paged
+    by ``post_id`` with ``limit`` and ``next_cursor``. Posts that do not exist or belong
+    to someone else are left out, so callers match results on ``post_id``.
+    """
+    if user.role != UserRole.admin:
+        owner_id = user.id
+    # The counter table already holds the per-type pivot, so the derived metrics are
+    # plain column arithmetic in the export query rather than a FILTER over reactions.
+    q = metrics_export_query(owner_id)
+    if ids is not None:
+        q = q.where(Post.id.in_(_parse_ids(ids)))
+    else:
+        if cursor is not None:
+            try:
+                (after,) = decode_cursor(cursor, 1)
+                q = q.where(Post.id > int(after))
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        q = q.limit(limit + 1)
+    rows = (await db.execute(q)).all()
+    next_cursor = None
+    if ids is None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].post_id)
+    columns = zip(*rows) if rows else ([] for _ in EXPORT_COLUMNS)
+    return FastJSONResponse({**dict(zip(EXPORT_COLUMNS, columns)), "next_cursor": next_cursor})
+
+
+@router.get("/post/{post_id}/timeseries", response_model=TimeseriesResponse)
+async def post_timeseries(
+    post_id: int,
+    granularity: RollupGranularity = RollupGranularity.hour,
+    time_from: Optional[datetime] = Query(default=None, alias="from"),
+    time_to: Optional[datetime] = Query(default=None, alias="to"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CurrentUser = Depends(get_current_identity),
+):
+    """Reactions per hour or day for one post, read from the rollup tables only.
+
+    Defaults to the last 30 days. Empty buckets are omitted, and the newest reactions
+    show up once the rollup job has folded them in.
+    """
+    post = await db.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     if user.role != UserRole.admin and post.owner_id != user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    metrics = _metrics_for_posts(db, [post_id])
-    return metrics.get(post_id, PostMetric(post_id=post_id, total_reactions=0, like=0, praise=0, empathy=0, interest=0, appreciation=0, impressions=0, comments=0, shares=0))
+    # Bounds without an offset are taken as UTC, like every stored timestamp.
+    if time_to is not None and time_to.tzinfo is None:
+        time_to = time_to.replace(tzinfo=timezone.utc)
+    if time_from is not None and time_from.tzinfo is None:
+        time_from = time_from.replace(tzinfo=timezone.utc)
+    time_to = time_to or datetime.now(timezone.utc)
+    time_from = time_from or time_to - timedelta(days=30)
+    bucket_size = timedelta(hours=1) if granularity == RollupGranularity.hour else timedelta(days=1)
+    if time_from > time_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (time_to - time_from) / bucket_size > MAX_TIMESERIES_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TIMESERIES_BUCKETS} buckets per request")
+
+    per_type = {
+        rtype.value: func.coalesce(func.sum(ReactionRollup.count).filter(ReactionRollup.type == rtype), 0).label(rtype.value)
+        for rtype in ReactionType
+    }
+    rows = await db.execute(
+        select(ReactionRollup.bucket_start, func.sum(ReactionRollup.count).label("total_reactions"), *per_type.values())
+        .where(
+            ReactionRollup.post_id == post_id,
+            ReactionRollup.granularity == granularity,
+            ReactionRollup.bucket_start >= time_from,
+            ReactionRollup.bucket_start <= time_to,
+        )
+        .group_by(ReactionRollup.bucket_start)
+        .order_by(ReactionRollup.bucket_start)
+    )
+    return {"post_id": post_id, "granularity": granularity, "buckets": [row._asdict() for row in rows]}
 
 
-@router.get("/top", response_model=TopPostsResponse)
-def top_posts(limit: int = 5, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    q = db.query(Post.id)
+@router.get("/top", response_model=TopPostsResponse, dependencies=[Depends(query_budget(3))])
+async def top_posts(
+    request: Request,
+    limit: int = Query(default=5, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: CurrentUser = Depends(get_current_identity),
+):
+    """Top posts by engagement, ranked by total reactions.
+
+    Responses carry an ``ETag`` and honour ``If-None-Match``. A page can trail the
+    latest reactions and deletes by up to ``ANALYTICS_TOP_MAX_STALENESS_SECONDS``.
+    """
+    owner_id = None if user.role == UserRole.admin else user.id
+    after = None
+    if cursor is not None:
+        try:
+            after = tuple(int(v) for v in decode_cursor(cursor, 2))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # With the engagement index enabled, pages within its top ENGAGEMENT_INDEX_TOP_K are
+    # ranked in memory and tagged by their content.
+    index = get_engagement_index()
+    page = index.top_page(owner_id, limit, offset, after) if index is not None else None
+    if page is not None:
+        body = dumps(page)
+        etag = make_etag("top", body)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        return json_response(etag, body)
+
+    # Otherwise the tag is max(version) of the caller's counters, read from the version
+    # indexes. Versions are taken from a sequence when a statement runs, not when it
+    # commits, so a write that commits late or a delete can leave max(version) unchanged;
+    # the staleness epoch in the tag bounds how long such a page is served.
+    stamp = select(func.max(PostReactionCount.version))
+    if owner_id is not None:
+        stamp = stamp.where(PostReactionCount.owner_id == owner_id)
+    max_version = await db.scalar(stamp)
+    epoch = int(time.time() // settings.analytics_top_max_staleness_seconds)
+    etag = make_etag("top", owner_id, max_version, epoch, limit, offset, after)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    key = ("top", owner_id, limit, offset, after)
+    body = cached_body(key, etag)
+    if body is None:
+        page = await _top_page(db, owner_id, limit, offset, after)
+        body = dumps(page)
+        store_body(key, etag, body)
+    return json_response(etag, body)
+
+
+async def _top_page(db: AsyncSession, owner_id: Optional[int], limit: int, offset: int, after: Optional[tuple]) -> dict:
+    q = select(*metric_columns(PostReactionCount.post_id))
+    if owner_id is not None:
+        q = q.where(PostReactionCount.owner_id == owner_id)
+    if after is not None:
+        q = q.where(tuple_(PostReactionCount.total_reactions, PostReactionCount.post_id) < tuple_(*after))
+    # impressions, shares and comments are all derived from total_reactions, so ordering
+    # by it alone reproduces the (total, impressions, shares, comments) ranking.
+    rows = (
+        await db.execute(
+            q.order_by(PostReactionCount.total_reactions.desc(), PostReactionCount.post_id.desc())
+            .offset(offset)
+            .limit(limit + 1)
+        )
+    ).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].total_reactions, rows[-1].post_id)
+    return {"items": rows_as_dicts(rows), "next_cursor": next_cursor}
+
+
+@router.get("/export")
+async def export_metrics(
+    format: str = Query(default="csv", pattern="^(csv|parquet)$"),
+    owner_id: Optional[int] = None,
+    user: CurrentUser = Depends(get_current_identity),
+):
+    """Stream ``PostMetric`` fields for every post of the caller (admins: every post, or
+    ``owner_id``'s) as CSV or Parquet, straight from a server-side cursor."""
     if user.role != UserRole.admin:
-        q = q.filter(Post.owner_id == user.id)
-    post_ids = [pid for (pid,) in q.all()]
-    metrics = _metrics_for_posts(db, post_ids)
-    top = sorted(metrics.values(), key=lambda m: (m.total_reactions, m.impressions, m.shares, m.comments), reverse=True)[:limit]
-    return {"items": top}
+        owner_id = user.id
+    q = metrics_export_query(owner_id)
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+        return StreamingResponse(
+            stream_parquet(q),
+            media_type="application/vnd.apache.parquet",
+            headers={"Content-Disposition": 'attachment; filename="post_metrics.parquet"'},
+        )
+    return StreamingResponse(
+        stream_csv(q),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="post_metrics.csv"'},
+    )
@@ -1,34 +1,57 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.models.user import User, UserRole
 from app.schemas.auth import SignupRequest, Token
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.security import HashPoolBusy, create_access_token, hash_password_async, verify_password_async
 
 router = APIRouter()
 
 
+def _hash_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, retry later",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/signup", response_model=Token)
-def signup(payload: SignupRequest, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == payload.email).first()
+async def signup(payload: SignupRequest, db: AsyncSession = Depends(get_db)):
+    existing = await db.scalar(select(User).where(User.email == payload.email))
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
     role = UserRole(payload.role) if payload.role in {r.value for r in UserRole} else UserRole.user
-    user = User(email=payload.email, hashed_password=get_password_hash(payload.password), role=role)
+    try:
+        hashed_password = await hash_password_async(payload.password)
+    except HashPoolBusy:
+        raise _hash_pool_busy()
+    user = User(email=payload.email, hashed_password=hashed_password, role=role)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     token = create_access_token(subject=user.email, role=user.role.value, expires_delta=timedelta(minutes=60))
     return {"access_token": token, "token_type": "bearer"}
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+    try:
+        verified, new_hash = await verify_password_async(form_data.password, user.hashed_password)
+    except HashPoolBusy:
+        raise _hash_pool_busy()
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+    if new_hash is not None:
+        # BCRYPT_ROUNDS changed since this hash was made; upgrade it transparently.
+        user.hashed_password = new_hash
+        await db.commit()
     token = create_access_token(subject=user.email, role=user.role.value)
     return {"access_token": token, "token_type": "bearer"}
@@ -0,0 +1,58 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import REGISTRY, Counter, Gauge
+from app.core.security import hash_pool_pending
+from app.db.session import created_engines
+from app.deps import user_cache
+from app.services.analytics_cache import response_cache
+from app.services.engagement_index import get_engagement_index
+from app.services.publisher import publish_stats
+from app.services.reaction_buffer import get_reaction_buffer
+from app.services.scheduler import due_queue_size
+
+router = APIRouter()
+
+
+def _pool_stat(name: str) -> dict[tuple, float]:
+    values = {}
+    for label, async_engine in created_engines().items():
+        stat = getattr(async_engine.sync_engine.pool, name, None)
+        values[(label,)] = stat() if callable(stat) else 0
+    return values
+
+
+def _buffer_stat(name: str) -> float:
+    buffer = get_reaction_buffer()
+    return buffer.stats()[name] if buffer is not None else 0
+
+
+def _index_posts() -> float:
+    index = get_engagement_index()
+    return index.posts if index is not None else 0
+
+
+def _cache_stat(name: str) -> dict[tuple, float]:
+    return {("user",): getattr(user_cache, name), ("analytics",): getattr(response_cache, name)}
+
+
+# Read at scrape time from the objects that already track these values.
+Gauge("db_pool_size", "Configured size of the SQLAlchemy connection pool.", ("engine",), callback=lambda: _pool_stat("size"))
+Gauge("db_pool_checked_out", "Connections currently checked out of the pool.", ("engine",), callback=lambda: _pool_stat("checkedout"))
+Gauge("db_pool_overflow", "Connections open beyond the pool size (negative while the pool is not yet full).", ("engine",), callback=lambda: _pool_stat("overflow"))
+Gauge("scheduler_due_posts", "Scheduled posts waiting in this process's due-time queue.", callback=due_queue_size)
+Counter("publish_published_total", "Posts published by this process.", callback=lambda: publish_stats.published)
+Counter("publish_failed_total", "Posts that ran out of publish attempts.", callback=lambda: publish_stats.failed)
+Counter("publish_retries_total", "Publish attempts that were retried.", callback=lambda: publish_stats.retries)
+Gauge("bcrypt_pool_pending", "Hash/verify calls queued or running on the bcrypt process pool.", callback=hash_pool_pending)
+Gauge("reaction_buffer_queue_depth", "Reactions waiting in the write-behind buffer.", callback=lambda: _buffer_stat("queue_depth"))
+Counter("reaction_buffer_rejected_total", "Reactions refused because the buffer was full.", callback=lambda: _buffer_stat("rejected"))
+Counter("reaction_buffer_dropped_total", "Queued reactions discarded by failed flushes (deleted posts or exhausted retries).", callback=lambda: _buffer_stat("dropped"))
+Gauge("engagement_index_posts", "Posts held by the in-process engagement index (0 while disabled or loading).", callback=_index_posts)
+Counter("cache_hits_total", "In-process cache hits.", ("cache",), callback=lambda: _cache_stat("hits"))
+Counter("cache_misses_total", "In-process cache misses.", ("cache",), callback=lambda: _cache_stat("misses"))
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
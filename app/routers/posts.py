@@ -1,32 +1,43 @@
 from datetime import datetime, timezone
 import random
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-
-from app.db.session import get_db
-from app.deps import get_current_user, require_admin
-from app.models.post import Post, PostStatus
-from app.models.user import User, UserRole
-from app.schemas.posts import PostCreate, PostOut, PostUpdate
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, insert, or_, select, tuple_, update
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.query_stats import query_budget
+from app.core.serialization import FastJSONResponse, dumps, rows_as_dicts
+from app.db.session import ReadSessionLocal, get_db, get_read_db
+from app.deps import CurrentUser, get_current_identity, require_admin
+from app.models.post import REACTION_COUNTS_VERSION_SEQ, Post, PostReactionCount, PostStatus
+from app.models.user import UserRole
+from app.schemas.posts import PostCreate, PostOut, PostPage, PostUpdate
+from app.services.analytics_cache import invalidate_post_metrics
+from app.services.engagement_index import index_posts, unindex_post
+from app.services.scheduler import notify_schedule_change, schedule_post, schedule_posts, unschedule_post
 
 router = APIRouter()
 
+STREAM_BATCH_SIZE = 1000
+MAX_BULK_POSTS = 1000
+_POST_OUT_COLUMNS = (Post.id, Post.owner_id, Post.content, Post.status, Post.scheduled_at, Post.published_at, Post.created_at)
 
-@router.post("/", response_model=PostOut)
-def create_post(payload: PostCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+
+def _new_post_values(payload: PostCreate, owner_id: int, now: datetime) -> dict:
+    """Column values for a new post; raises ``ValueError`` with the client-facing reason."""
     scheduled_at = None
     scheduled_second = None
     if payload.scheduled_date is not None:
         try:
             dt = datetime.strptime(payload.scheduled_date + " " + str(payload.scheduled_hour or 0) + ":" + str(payload.scheduled_minute or 0), "%Y-%m-%d %H:%M")
         except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date/hour/minute")
+            raise ValueError("Invalid date/hour/minute")
         dt = dt.replace(second=0, microsecond=0, tzinfo=timezone.utc)
-        if dt < datetime.now(timezone.utc):
-            raise HTTPException(status_code=400, detail="Cannot schedule in the past")
+        if dt < now:
+            raise ValueError("Cannot schedule in the past")
         scheduled_at = dt
         scheduled_second = random.randint(0, 59)
         status_value = PostStatus.scheduled
@@ -37,40 +48,128 @@ def create_post(payload: PostCreate, db: Session = Depends(get_db), user: User =
         try:
             status_value = PostStatus(payload.status)
         except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid status")
+            raise ValueError("Invalid status")
 
-    post = Post(owner_id=user.id, content=payload.content, status=status_value, scheduled_at=scheduled_at, scheduled_second=scheduled_second)
+    return {
+        "owner_id": owner_id,
+        "content": payload.content,
+        "status": status_value,
+        "scheduled_at": scheduled_at,
+        "scheduled_second": scheduled_second,
+    }
+
+
+@router.post("/", response_model=PostOut)
+async def create_post(payload: PostCreate, db: AsyncSession = Depends(get_db), user: CurrentUser = Depends(get_current_identity)):
+    try:
+        values = _new_post_values(payload, user.id, datetime.now(timezone.utc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    post = Post(**values)
+    post.reaction_counts = PostReactionCount(owner_id=user.id)
     db.add(post)
-    db.commit()
-    db.refresh(post)
+    if post.status == PostStatus.scheduled:
+        await db.flush()
+        await notify_schedule_change(db, [post.id])
+    await db.commit()
+    await db.refresh(post)
+    index_posts([(post.id, post.owner_id)])
+    if post.status == PostStatus.scheduled:
+        schedule_post(post.id, post.scheduled_at, post.scheduled_second)
     return post
 
 
-@router.get("/", response_model=List[PostOut])
-def list_posts(
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+@router.post("/bulk", response_model=List[PostOut])
+async def bulk_create_posts(payloads: List[PostCreate], db: AsyncSession = Depends(get_db), user: CurrentUser = Depends(get_current_identity)):
+    """Create (and schedule) many posts in one transaction.
+
+    Every item is validated with the same rules as ``POST /posts/`` before anything is
+    written; if any item is invalid nothing is created and the errors are returned by
+    index. Posts are inserted with one multi-row ``INSERT ... RETURNING``.
+    """
+    if len(payloads) > MAX_BULK_POSTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_POSTS} posts per request")
+    if not payloads:
+        return []
+    now = datetime.now(timezone.utc)
+    rows: list[dict] = []
+    errors: list[dict] = []
+    for index, payload in enumerate(payloads):
+        try:
+            rows.append({**_new_post_values(payload, user.id, now), "created_at": now})
+        except ValueError as exc:
+            errors.append({"index": index, "detail": str(exc)})
+    if errors:
+        raise HTTPException(status_code=400, detail=errors)
+
+    created = (await db.execute(insert(Post).values(rows).returning(*_POST_OUT_COLUMNS, Post.scheduled_second))).all()
+    await db.execute(insert(PostReactionCount), [{"post_id": row.id, "owner_id": user.id} for row in created])
+    await notify_schedule_change(db, [row.id for row in created if row.status == PostStatus.scheduled])
+    await db.commit()
+    index_posts((row.id, row.owner_id) for row in created)
+    schedule_posts((row.id, row.scheduled_at, row.scheduled_second) for row in created if row.status == PostStatus.scheduled)
+    return created
+
+
+async def _stream_posts(q) -> AsyncIterator[bytes]:
+    # The request's session is closed before a streaming body runs, so use a dedicated one.
+    async with ReadSessionLocal() as db:
+        result = await db.stream(q.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield b"".join(dumps(item) + b"\n" for item in rows_as_dicts(rows))
+
+
+@router.get("/", response_model=PostPage, dependencies=[Depends(query_budget(2))])
+async def list_posts(
+    db: AsyncSession = Depends(get_read_db),
+    user: CurrentUser = Depends(get_current_identity),
     owner_id: Optional[int] = None,
     time_from: Optional[datetime] = Query(default=None),
     time_to: Optional[datetime] = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    stream: bool = False,
 ):
-    q = db.query(Post)
+    """Newest posts first, one keyset page at a time.
+
+    Pass the returned ``next_cursor`` back as ``cursor`` for the next page. With
+    ``stream=true`` every matching row (after ``cursor``, if given) is sent as NDJSON from
+    a server-side cursor and ``limit`` is ignored.
+    """
+    q = select(*_POST_OUT_COLUMNS)
     if user.role != UserRole.admin:
-        q = q.filter(Post.owner_id == user.id)
+        q = q.where(Post.owner_id == user.id)
     elif owner_id is not None:
-        q = q.filter(Post.owner_id == owner_id)
+        q = q.where(Post.owner_id == owner_id)
 
     if time_from is not None:
-        q = q.filter(Post.created_at >= time_from)
+        q = q.where(Post.created_at >= time_from)
     if time_to is not None:
-        q = q.filter(Post.created_at <= time_to)
-
-    return q.order_by(Post.created_at.desc()).all()
-
-
-@router.get("/{post_id}", response_model=PostOut)
-def get_post(post_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    post = db.query(Post).filter(Post.id == post_id).first()
+        q = q.where(Post.created_at <= time_to)
+    if cursor is not None:
+        try:
+            after_created, after_id = decode_cursor(cursor, 2)
+            after_created, after_id = datetime.fromisoformat(after_created), int(after_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        q = q.where(tuple_(Post.created_at, Post.id) < tuple_(after_created, after_id))
+    q = q.order_by(Post.created_at.desc(), Post.id.desc())
+
+    if stream:
+        return StreamingResponse(_stream_posts(q), media_type="application/x-ndjson")
+
+    rows = (await db.execute(q.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at.isoformat(), rows[-1].id)
+    # Rendered straight from the rows; PostPage only documents the shape.
+    return FastJSONResponse({"items": rows_as_dicts(rows), "next_cursor": next_cursor})
+
+
+@router.get("/{post_id}", response_model=PostOut, dependencies=[Depends(query_budget(2))])
+async def get_post(post_id: int, db: AsyncSession = Depends(get_read_db), user: CurrentUser = Depends(get_current_identity)):
+    post = await db.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     if user.role != UserRole.admin and post.owner_id != user.id:
@@ -79,30 +178,50 @@ def get_post(post_id: int, db: Session = Depends(get_db), user: User = Depends(g
 
 
 @router.put("/{post_id}", response_model=PostOut)
-def update_post(post_id: int, payload: PostUpdate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    post = db.query(Post).filter(Post.id == post_id).first()
+async def update_post(post_id: int, payload: PostUpdate, db: AsyncSession = Depends(get_db), user: CurrentUser = Depends(get_current_identity)):
+    post = await db.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     if user.role != UserRole.admin and post.owner_id != user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
+    was_scheduled = post.status == PostStatus.scheduled
     post.content = payload.content or post.content
     if payload.status:
         try:
             post.status = PostStatus(payload.status)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid status")
-    db.commit()
-    db.refresh(post)
+    # Move the analytics version stamp so cached metrics and ETags for this post expire.
+    await db.execute(
+        update(PostReactionCount)
+        .where(PostReactionCount.post_id == post.id)
+        .values(version=REACTION_COUNTS_VERSION_SEQ.next_value())
+        .execution_options(synchronize_session=False)
+    )
+    if was_scheduled or post.status == PostStatus.scheduled:
+        await notify_schedule_change(db, [post.id])
+    await db.commit()
+    await db.refresh(post)
+    invalidate_post_metrics([post.id])
+    if post.status == PostStatus.scheduled:
+        schedule_post(post.id, post.scheduled_at, post.scheduled_second)
+    else:
+        unschedule_post(post.id)
     return post
 
 
 @router.delete("/{post_id}", status_code=204)
-def delete_post(post_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    post = db.query(Post).filter(Post.id == post_id).first()
+async def delete_post(post_id: int, db: AsyncSession = Depends(get_db), user: CurrentUser = Depends(get_current_identity)):
+    post = await db.get(Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     if user.role != UserRole.admin and post.owner_id != user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    db.delete(post)
-    db.commit()
+    if post.status == PostStatus.scheduled:
+        await notify_schedule_change(db, [post_id])
+    await db.delete(post)
+    await db.commit()
+    unschedule_post(post_id)
+    invalidate_post_metrics([post_id])
+    unindex_post(post_id)
     return
@@ -1,5 +1,9 @@
+from datetime import datetime
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+
+from app.models.post import ReactionType
+from app.models.rollup import RollupGranularity
 
 
 class PostMetric(BaseModel):
@@ -15,5 +19,54 @@ class PostMetric(BaseModel):
     shares: int
 
 
+class PostMetricColumns(BaseModel):
+    """``PostMetric`` fields as parallel arrays, one entry per post in ``post_id`` order."""
+
+    post_id: List[int]
+    total_reactions: List[int]
+    like: List[int]
+    praise: List[int]
+    empathy: List[int]
+    interest: List[int]
+    appreciation: List[int]
+    impressions: List[int]
+    comments: List[int]
+    shares: List[int]
+    next_cursor: Optional[str] = None
+
+
 class TopPostsResponse(BaseModel):
     items: List[PostMetric]
+    next_cursor: Optional[str] = None
+
+
+class ReactionIn(BaseModel):
+    post_id: int
+    type: ReactionType
+    created_at: Optional[datetime] = None
+
+
+class BulkReactionError(BaseModel):
+    index: int
+    detail: str
+
+
+class BulkReactionResult(BaseModel):
+    inserted: int
+    errors: List[BulkReactionError]
+
+
+class TimeseriesBucket(BaseModel):
+    bucket_start: datetime
+    total_reactions: int
+    like: int
+    praise: int
+    empathy: int
+    interest: int
+    appreciation: int
+
+
+class TimeseriesResponse(BaseModel):
+    post_id: int
+    granularity: RollupGranularity
+    buckets: List[TimeseriesBucket]
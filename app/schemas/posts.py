@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import BaseModel, field_validator
-from typing import Optional
+from typing import List, Optional
 
 
 class PostBase(BaseModel):
@@ -38,5 +38,10 @@ class PostOut(BaseModel):
         from_attributes = True
 
 
+class PostPage(BaseModel):
+    items: List[PostOut]
+    next_cursor: Optional[str] = None
+
+
 class ReactionCreate(BaseModel):
     type: str
@@ -0,0 +1,51 @@
+import hashlib
+from typing import Hashable, Iterable, Optional
+
+from fastapi import Response
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Serialized analytics responses keyed by request shape, each stored with the ETag it
+# was rendered for. An entry is only served while its ETag still matches the database.
+response_cache = TTLCache(maxsize=settings.analytics_cache_max_size, ttl=settings.analytics_cache_ttl_seconds)
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def cached_body(key: Hashable, etag: str) -> Optional[bytes]:
+    entry = response_cache.get(key)
+    if entry is None or entry[0] != etag:
+        return None
+    return entry[1]
+
+
+def store_body(key: Hashable, etag: str, body: bytes) -> None:
+    response_cache.set(key, (etag, body))
+
+
+def json_response(etag: str, body: bytes) -> Response:
+    return Response(body, media_type="application/json", headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def invalidate_post_metrics(post_ids: Iterable[int]) -> None:
+    """Drop cached per-post metrics after their counters changed in this process.
+
+    Other processes notice the change through the version stamp on their next read.
+    """
+    for post_id in post_ids:
+        response_cache.pop(("post", post_id))
@@ -0,0 +1,309 @@
+"""Optional in-process engagement index for ``/analytics/top`` and ``/analytics/post/{id}``.
+
+Reaction counts live in flat ``array('i')`` columns indexed directly by post id. Post ids
+come from a sequence and are dense, so each post costs about 32 bytes: seven columns
+plus its entry in the per-owner id list. Top-K rankings (global and per owner) are kept
+as sorted ``(total, post_id)`` lists and updated incrementally. They are built on first
+use, and rebuilt only when a deleted member leaves a hole.
+
+Counter changes are staged on the session by ``bump_reaction_counts`` and applied after
+commit. Routers add and remove posts after their own commits. Each process sees only
+its own writes, so a background task reloads the index from ``post_reaction_counts``
+every ``ENGAGEMENT_INDEX_RECONCILE_SECONDS``. That also picks up reactions written by
+other workers.
+"""
+from array import array
+import asyncio
+from bisect import bisect_left, insort
+import heapq
+from itertools import count
+import logging
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pagination import encode_cursor
+from app.db.session import SessionLocal
+from app.models.post import PostReactionCount, ReactionType
+
+logger = logging.getLogger(__name__)
+
+REACTION_COLUMNS = [rtype.value for rtype in ReactionType]
+LOAD_BATCH_SIZE = 10000
+STAGED_OPS_KEY = "engagement_index_counts"
+# Total of an id that has no post (never created, or deleted); sorts below every real post.
+ABSENT = -1
+
+_index: "EngagementIndex | None" = None
+_loaded = False
+_task: asyncio.Task | None = None
+
+
+class _TopK:
+    """The ``k`` highest ``(total, post_id)`` keys of one scope, in ascending order.
+
+    ``complete`` means every post of the scope is in ``keys``.
+    """
+
+    __slots__ = ("k", "keys", "complete")
+
+    def __init__(self, k: int, keys: list[tuple[int, int]], complete: bool) -> None:
+        self.k = k
+        self.keys = keys
+        self.complete = complete
+
+    def update(self, old: Optional[tuple[int, int]], new: Optional[tuple[int, int]]) -> bool:
+        """Move one post from key ``old`` to ``new`` (``None`` for added or removed posts).
+
+        Returns False when the list can no longer tell what its last entry should be and
+        has to be rebuilt.
+        """
+        keys = self.keys
+        present = False
+        if old is not None:
+            i = bisect_left(keys, old)
+            if i < len(keys) and keys[i] == old:
+                del keys[i]
+                present = True
+        if new is None:
+            return self.complete or not present
+        if self.complete or (keys and new > keys[0]):
+            insort(keys, new)
+            if len(keys) > self.k:
+                del keys[0]
+                self.complete = False
+            return True
+        return not present
+
+    def page(self, limit: int, offset: int, after: Optional[tuple[int, int]]) -> Optional[list[int]]:
+        """Up to ``limit + 1`` post ids in ranking order, or None if the page reaches past
+        what this list holds."""
+        end = (bisect_left(self.keys, after) if after is not None else len(self.keys)) - offset
+        start = end - (limit + 1)
+        if start < 0 and not self.complete:
+            return None
+        return [post_id for _, post_id in reversed(self.keys[max(start, 0):max(end, 0)])]
+
+
+class EngagementIndex:
+    def __init__(self, top_k: int) -> None:
+        self.top_k = top_k
+        self.posts = 0
+        self._owner = array("i")
+        self._counts = {col: array("i") for col in REACTION_COLUMNS}
+        self._total = array("i")
+        self._owner_posts: dict[int, array] = {}
+        self._tops: dict[Optional[int], _TopK] = {}
+        # Post ids changed while a replacement index is loading; see ``refresh_engagement_index``.
+        self._touched: Optional[set[int]] = None
+
+    def _grow(self, post_id: int) -> None:
+        missing = post_id + 1 - len(self._owner)
+        if missing > 0:
+            self._owner.frombytes(bytes(4 * missing))
+            for column in self._counts.values():
+                column.frombytes(bytes(4 * missing))
+            self._total.extend(array("i", [ABSENT]) * missing)
+
+    def owner_of(self, post_id: int) -> Optional[int]:
+        if 0 <= post_id < len(self._owner) and self._owner[post_id]:
+            return self._owner[post_id]
+        return None
+
+    def _moved(self, post_id: int, owner_id: int, old_total: Optional[int], new_total: Optional[int]) -> None:
+        old = (old_total, post_id) if old_total is not None else None
+        new = (new_total, post_id) if new_total is not None else None
+        for scope in (None, owner_id):
+            top = self._tops.get(scope)
+            if top is not None and not top.update(old, new):
+                del self._tops[scope]
+
+    def set_post(self, post_id: int, owner_id: int, counts: Iterable[int]) -> None:
+        """Store a post's absolute counts (in ``REACTION_COLUMNS`` order)."""
+        self._grow(post_id)
+        old_total = None
+        if self._owner[post_id]:
+            old_total = self._total[post_id]
+        else:
+            self._owner[post_id] = owner_id
+            self._owner_posts.setdefault(owner_id, array("i")).append(post_id)
+            self.posts += 1
+        total = 0
+        for column, value in zip(self._counts.values(), counts):
+            column[post_id] = value
+            total += value
+        self._total[post_id] = total
+        self._moved(post_id, owner_id, old_total, total)
+        if self._touched is not None:
+            self._touched.add(post_id)
+
+    def add_counts(self, post_id: int, owner_id: int, deltas: Mapping[str, int]) -> None:
+        if self.owner_of(post_id) is None:
+            self.set_post(post_id, owner_id, (deltas.get(col, 0) for col in REACTION_COLUMNS))
+            return
+        self.set_post(post_id, owner_id, (self._counts[col][post_id] + deltas.get(col, 0) for col in REACTION_COLUMNS))
+
+    def remove_post(self, post_id: int) -> None:
+        owner_id = self.owner_of(post_id)
+        if self._touched is not None:
+            self._touched.add(post_id)
+        if owner_id is None:
+            return
+        old_total = self._total[post_id]
+        self._owner[post_id] = 0
+        for column in self._counts.values():
+            column[post_id] = 0
+        self._total[post_id] = ABSENT
+        owned = self._owner_posts[owner_id]
+        owned.remove(post_id)
+        if not owned:
+            del self._owner_posts[owner_id]
+        self.posts -= 1
+        self._moved(post_id, owner_id, old_total, None)
+
+    def metric(self, post_id: int) -> dict:
+        """Every ``PostMetric`` field for one indexed post, in schema order."""
+        total = self._total[post_id]
+        return {
+            "post_id": post_id,
+            "total_reactions": total,
+            **{col: self._counts[col][post_id] for col in REACTION_COLUMNS},
+            "impressions": total * 10,
+            "comments": total // 3,
+            "shares": total // 5,
+        }
+
+    def _top_for(self, owner_id: Optional[int]) -> _TopK:
+        top = self._tops.get(owner_id)
+        if top is None:
+            if owner_id is None:
+                candidates = zip(self._total, count())
+                size = self.posts
+            else:
+                owned = self._owner_posts.get(owner_id, ())
+                candidates = ((self._total[post_id], post_id) for post_id in owned)
+                size = len(owned)
+            keys = [key for key in heapq.nlargest(self.top_k, candidates) if key[0] != ABSENT]
+            keys.reverse()
+            top = self._tops[owner_id] = _TopK(self.top_k, keys, size <= self.top_k)
+        return top
+
+    def top_page(self, owner_id: Optional[int], limit: int, offset: int, after: Optional[tuple]) -> Optional[dict]:
+        """A ``/analytics/top`` page, or None if it lies beyond the top ``ENGAGEMENT_INDEX_TOP_K``."""
+        post_ids = self._top_for(owner_id).page(limit, offset, tuple(after) if after is not None else None)
+        if post_ids is None:
+            return None
+        next_cursor = None
+        if len(post_ids) > limit:
+            post_ids = post_ids[:limit]
+            next_cursor = encode_cursor(self._total[post_ids[-1]], post_ids[-1])
+        return {"items": [self.metric(post_id) for post_id in post_ids], "next_cursor": next_cursor}
+
+
+def get_engagement_index() -> EngagementIndex | None:
+    """The live index once its first load finished, else None (callers then query the database)."""
+    return _index if _loaded else None
+
+
+def index_posts(posts: Iterable[tuple[int, int]]) -> None:
+    """Add newly created ``(post_id, owner_id)`` posts with zero counts; call after commit."""
+    if _index is not None:
+        for post_id, owner_id in posts:
+            if _index.owner_of(post_id) is None:
+                _index.set_post(post_id, owner_id, [0] * len(REACTION_COLUMNS))
+
+
+def unindex_post(post_id: int) -> None:
+    if _index is not None:
+        _index.remove_post(post_id)
+
+
+def stage_counts(session: Session, by_post: Mapping[int, Mapping[str, int]], owners: Mapping[int, int]) -> None:
+    """Queue counter deltas to apply to the index once ``session`` commits."""
+    if _index is not None:
+        staged = session.info.setdefault(STAGED_OPS_KEY, [])
+        staged.extend((post_id, owners[post_id], deltas) for post_id, deltas in by_post.items())
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_staged_counts(session: Session) -> None:
+    staged = session.info.pop(STAGED_OPS_KEY, None)
+    if staged and _index is not None:
+        for post_id, owner_id, deltas in staged:
+            _index.add_counts(post_id, owner_id, deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_staged_counts(session: Session) -> None:
+    session.info.pop(STAGED_OPS_KEY, None)
+
+
+async def _load_posts(index: EngagementIndex, post_ids: Optional[set[int]] = None) -> None:
+    columns = [PostReactionCount.post_id, PostReactionCount.owner_id, *(PostReactionCount.__table__.c[col] for col in REACTION_COLUMNS)]
+    q = select(*columns)
+    if post_ids is not None:
+        q = q.where(PostReactionCount.post_id.in_(post_ids))
+    found = set()
+    async with SessionLocal() as db:
+        result = await db.stream(q.execution_options(yield_per=LOAD_BATCH_SIZE))
+        async for rows in result.partitions():
+            for post_id, owner_id, *counts in rows:
+                index.set_post(post_id, owner_id, counts)
+                found.add(post_id)
+    for post_id in (post_ids or set()) - found:
+        index.remove_post(post_id)
+
+
+async def refresh_engagement_index() -> None:
+    """Load a fresh index from ``post_reaction_counts`` and swap it in.
+
+    Posts the live index changes during the load are re-read before the swap, so the
+    fresh index does not miss writes made while it was loading.
+    """
+    global _index, _loaded
+    live = _index
+    if live is None:
+        return
+    fresh = EngagementIndex(settings.engagement_index_top_k)
+    live._touched = set()
+    try:
+        await _load_posts(fresh)
+        while live._touched:
+            touched, live._touched = live._touched, set()
+            await _load_posts(fresh, touched)
+    finally:
+        live._touched = None
+    fresh._top_for(None)
+    _index = fresh
+    _loaded = True
+
+
+async def _run() -> None:
+    while True:
+        try:
+            await refresh_engagement_index()
+        except Exception:
+            logger.exception("Engagement index refresh failed")
+        await asyncio.sleep(settings.engagement_index_reconcile_seconds)
+
+
+def engagement_index_startup() -> None:
+    global _index, _task
+    if settings.engagement_index_enabled and _task is None:
+        _index = EngagementIndex(settings.engagement_index_top_k)
+        _task = asyncio.create_task(_run(), name="engagement-index")
+
+
+async def engagement_index_shutdown() -> None:
+    global _index, _task, _loaded
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    _index = None
+    _loaded = False
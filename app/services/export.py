@@ -0,0 +1,109 @@
+import csv
+import io
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import func, select
+
+from app.db.session import ReadSessionLocal
+from app.models.post import Post, PostReactionCount
+
+EXPORT_BATCH_SIZE = 10000
+EXPORT_COLUMNS = [
+    "post_id", "total_reactions", "like", "praise", "empathy", "interest", "appreciation",
+    "impressions", "comments", "shares",
+]
+
+
+def metric_columns(post_id) -> list:
+    """Every ``PostMetric`` field, in order, as labelled expressions over
+    ``post_reaction_counts``; derived metrics are computed in SQL. Missing counter rows
+    (outer joins) read as zero."""
+    total = func.coalesce(PostReactionCount.total_reactions, 0)
+    return [
+        post_id.label("post_id"),
+        total.label("total_reactions"),
+        func.coalesce(PostReactionCount.like, 0).label("like"),
+        func.coalesce(PostReactionCount.praise, 0).label("praise"),
+        func.coalesce(PostReactionCount.empathy, 0).label("empathy"),
+        func.coalesce(PostReactionCount.interest, 0).label("interest"),
+        func.coalesce(PostReactionCount.appreciation, 0).label("appreciation"),
+        (total * 10).label("impressions"),
+        (total // 3).label("comments"),
+        (total // 5).label("shares"),
+    ]
+
+
+def metrics_export_query(owner_id: Optional[int]):
+    """One row per post with every ``PostMetric`` field."""
+    q = (
+        select(*metric_columns(Post.id))
+        .outerjoin(PostReactionCount, PostReactionCount.post_id == Post.id)
+        .order_by(Post.id)
+    )
+    if owner_id is not None:
+        q = q.where(Post.owner_id == owner_id)
+    return q
+
+
+async def _partitions(q) -> AsyncIterator[list]:
+    # Streaming bodies outlive the request's session, so open a dedicated one.
+    async with ReadSessionLocal() as db:
+        result = await db.stream(q.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield rows
+
+
+async def stream_csv(q) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    async for rows in _partitions(q):
+        writer.writerows(rows)
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last ``drain``."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_parquet(q) -> AsyncIterator[bytes]:
+    """Parquet with one row group per fetched partition (requires ``pyarrow``)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, pa.int64()) for name in EXPORT_COLUMNS])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for rows in _partitions(q):
+            columns = list(zip(*rows))
+            writer.write_batch(pa.RecordBatch.from_arrays([pa.array(col, pa.int64()) for col in columns], schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
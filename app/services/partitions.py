@@ -0,0 +1,162 @@
+from datetime import datetime, timezone
+import logging
+
+from sqlalchemy import func, select, text
+
+from app.core.config import settings
+from app.db.session import SessionLocal, get_engine
+from app.models.rollup import RollupWatermark
+from app.services.rollups import WATERMARK_NAME
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "reaction_p"
+DEFAULT_PARTITION = "reaction_default"
+# Temporary table holding default-partition rows while their month's partition is created.
+STASH_TABLE = "reaction_partition_stash"
+# Arbitrary constant; keeps maintenance to one process at a time across workers.
+MAINTENANCE_LOCK_ID = 0x72656163
+
+
+def _add_months(month: datetime, n: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + n
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _month_start(now: datetime) -> datetime:
+    return now.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y_%m}"
+
+
+def _partition_month(name: str) -> datetime | None:
+    try:
+        return datetime.strptime(name.removeprefix(PARTITION_PREFIX), "%Y_%m").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+async def _attached_partitions(db) -> list[str]:
+    rows = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'reaction'::regclass"
+        )
+    )
+    return [name for (name,) in rows]
+
+
+async def _default_partition_months(db) -> list[datetime]:
+    """Months (in UTC) that have rows sitting in ``reaction_default``."""
+    rows = await db.execute(
+        text("SELECT DISTINCT date_trunc('month', timezone('UTC', created_at)) " f'FROM "{DEFAULT_PARTITION}"')
+    )
+    return sorted(month.replace(tzinfo=timezone.utc) for (month,) in rows)
+
+
+async def _create_partition(db, month: datetime) -> None:
+    """Create ``month``'s partition, moving its rows out of ``reaction_default`` first.
+
+    Postgres refuses to create a partition while the default partition holds rows in its
+    range, so those rows go to a temporary table and are re-inserted through the parent
+    once the partition exists, all in the caller's transaction. Ids are kept.
+    """
+    name = partition_name(month)
+    upper = _add_months(month, 1)
+    await db.execute(text(f'CREATE TEMP TABLE "{STASH_TABLE}" (LIKE reaction)'))
+    moved = (
+        await db.execute(
+            text(
+                f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE created_at >= :lower AND created_at < :upper RETURNING *) '
+                f'INSERT INTO "{STASH_TABLE}" SELECT * FROM moved'
+            ),
+            {"lower": month, "upper": upper},
+        )
+    ).rowcount
+    # Partition bounds are DDL and cannot be bound parameters.
+    await db.execute(
+        text(
+            f'CREATE TABLE "{name}" PARTITION OF reaction '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+    )
+    if moved:
+        await db.execute(text(f'INSERT INTO reaction SELECT * FROM "{STASH_TABLE}"'))
+        logger.warning("Moved %d reactions from %s into %s", moved, DEFAULT_PARTITION, name)
+    await db.execute(text(f'DROP TABLE "{STASH_TABLE}"'))
+
+
+async def ensure_reaction_partitions(db, now: datetime) -> list[str]:
+    """Create monthly partitions from the current month through ``reaction_partition_months_ahead``,
+    plus one for every earlier month that has rows in ``reaction_default``.
+
+    Past rows get there through backfills and bulk imports with historical ``created_at``;
+    giving their month a partition lets retention detach it instead of deleting rows.
+    """
+    existing = set(await _attached_partitions(db))
+    current = _month_start(now)
+    months = [month for month in await _default_partition_months(db) if month < current]
+    months += [_add_months(current, offset) for offset in range(settings.reaction_partition_months_ahead + 1)]
+    created = []
+    for month in months:
+        name = partition_name(month)
+        if name in existing:
+            continue
+        await _create_partition(db, month)
+        existing.add(name)
+        created.append(name)
+    return created
+
+
+async def expire_reaction_partitions(db, now: datetime) -> list[str]:
+    """Drop (or detach) monthly partitions older than ``reaction_retention_months``.
+
+    A partition is only removed once the rollup watermark has passed its highest id, so
+    its reactions already live on in ``reaction_rollup``; ``post_reaction_counts`` keeps
+    the all-time totals either way. Removing a partition is a catalog change, not a
+    ``DELETE`` over its rows.
+    """
+    if not settings.reaction_retention_months:
+        return []
+    cutoff = _add_months(_month_start(now), -settings.reaction_retention_months)
+    folded_up_to = await db.scalar(select(RollupWatermark.last_reaction_id).where(RollupWatermark.name == WATERMARK_NAME)) or 0
+    expired = []
+    for name in sorted(await _attached_partitions(db)):
+        month = _partition_month(name)
+        if month is None or _add_months(month, 1) > cutoff:
+            continue
+        max_id = await db.scalar(text(f'SELECT max(id) FROM "{name}"'))
+        if max_id is not None and max_id > folded_up_to:
+            logger.warning("Keeping %s: reactions up to id %s are not rolled up yet", name, max_id)
+            continue
+        await db.execute(text(f'ALTER TABLE reaction DETACH PARTITION "{name}"'))
+        if settings.reaction_retention_drop:
+            await db.execute(text(f'DROP TABLE "{name}"'))
+        expired.append(name)
+    # Fallback only: ensure_reaction_partitions gives every past month in the default
+    # partition its own partition first, so this normally finds nothing to delete.
+    await db.execute(
+        text(f'DELETE FROM "{DEFAULT_PARTITION}" WHERE created_at < :cutoff AND id <= :folded'),
+        {"cutoff": cutoff, "folded": folded_up_to},
+    )
+    return expired
+
+
+async def maintain_reaction_partitions() -> None:
+    """Pre-create upcoming partitions and apply retention; a no-op on other databases."""
+    if get_engine().dialect.name != "postgresql":
+        return
+    try:
+        async with SessionLocal() as db:
+            if not await db.scalar(select(func.pg_try_advisory_xact_lock(MAINTENANCE_LOCK_ID))):
+                return
+            now = datetime.now(timezone.utc)
+            created = await ensure_reaction_partitions(db, now)
+            expired = await expire_reaction_partitions(db, now)
+            await db.commit()
+        if created or expired:
+            logger.info("Reaction partitions created: %s; expired: %s", created, expired)
+    except Exception:
+        logger.exception("Reaction partition maintenance failed")
@@ -0,0 +1,99 @@
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+import logging
+from typing import Any, Awaitable, Callable
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+Publisher = Callable[[Any], Awaitable[None]]
+
+PUBLISH_LAG_SECONDS = Histogram(
+    "publish_lag_seconds",
+    "Delay between a post's due time and its publication.",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+
+
+async def simulate_linkedin_publish(post: Any) -> None:
+    _ = post.id
+
+
+_publisher: Publisher = simulate_linkedin_publish
+
+
+def set_publisher(publisher: Publisher) -> None:
+    """Swap the function that pushes a post to LinkedIn, e.g. for a local stub in tests."""
+    global _publisher
+    _publisher = publisher
+
+
+class PublishStats:
+    """Publish outcomes plus a window of recent scheduled-to-published lags (seconds)."""
+
+    def __init__(self, window: int = 1000) -> None:
+        self.published = 0
+        self.failed = 0
+        self.retries = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+        self._recent: deque[float] = deque(maxlen=window)
+
+    def record_lag(self, lag: float) -> None:
+        self.published += 1
+        self.lag_total += lag
+        self.lag_max = max(self.lag_max, lag)
+        self._recent.append(lag)
+        PUBLISH_LAG_SECONDS.observe(lag)
+
+    def snapshot(self) -> dict:
+        recent = sorted(self._recent)
+
+        def pct(p: float) -> float:
+            return recent[min(len(recent) - 1, int(p * len(recent)))] if recent else 0.0
+
+        return {
+            "published": self.published,
+            "failed": self.failed,
+            "retries": self.retries,
+            "lag_avg_s": self.lag_total / self.published if self.published else 0.0,
+            "lag_max_s": self.lag_max,
+            "lag_p50_s": pct(0.50),
+            "lag_p95_s": pct(0.95),
+            "lag_p99_s": pct(0.99),
+        }
+
+
+publish_stats = PublishStats()
+_slots: asyncio.Semaphore | None = None
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.publish_workers)
+    return _slots
+
+
+async def publish_with_retry(post: Any) -> datetime | None:
+    """Publish one post on the bounded worker pool, retrying with exponential backoff.
+
+    A worker slot is held only while an attempt runs, not during backoff. Returns the
+    publish time, or ``None`` once ``publish_max_attempts`` have failed.
+    """
+    for attempt in range(1, settings.publish_max_attempts + 1):
+        try:
+            async with _get_slots():
+                await asyncio.wait_for(_publisher(post), timeout=settings.publish_timeout_seconds)
+            return datetime.now(timezone.utc)
+        except Exception:
+            if attempt == settings.publish_max_attempts:
+                logger.exception("Giving up on post %s after %d attempts", post.id, attempt)
+                publish_stats.failed += 1
+                return None
+            publish_stats.retries += 1
+            await asyncio.sleep(min(settings.publish_backoff_seconds * 2 ** (attempt - 1), settings.publish_backoff_max_seconds))
+    return None
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from sqlalchemy import exc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.post import Post, ReactionType
+from app.services.reactions import insert_reactions
+
+logger = logging.getLogger(__name__)
+
+_buffer: "ReactionBuffer | None" = None
+
+
+def _is_transient(error: Exception) -> bool:
+    """Errors worth retrying as-is: lost connections, pool timeouts and the like."""
+    if isinstance(error, exc.DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, (exc.OperationalError, exc.InterfaceError, exc.TimeoutError, OSError))
+
+
+class ReactionBuffer:
+    """Bounded in-process queue of reactions drained into batched inserts by a flusher task.
+
+    A batch is flushed once ``batch_size`` items are waiting or ``flush_interval_ms`` has
+    passed since its first item, whichever comes first. A batch that fails is retried up to
+    ``flush_attempts`` times in all; see ``_flush``.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        batch_size: int,
+        flush_interval_ms: int,
+        put_timeout_ms: int = 0,
+        flush_attempts: int = 1,
+        retry_backoff_ms: int = 0,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+    ) -> None:
+        self._queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_size)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_ms / 1000
+        self._put_timeout = put_timeout_ms / 1000
+        self._flush_attempts = max(1, flush_attempts)
+        self._retry_backoff = retry_backoff_ms / 1000
+        self._session_factory = session_factory
+        self._task: asyncio.Task | None = None
+        self._pending: list[dict] = []
+        self._inflight: asyncio.Future | None = None
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.flush_retries = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="reaction-buffer")
+
+    async def stop(self) -> None:
+        """Stop the flusher and write out everything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight is not None:
+            try:
+                await self._inflight
+            except Exception:
+                logger.exception("Failed to flush buffered reactions on shutdown")
+            self._inflight = None
+        while self._pending or not self._queue.empty():
+            await self._drain(block=False)
+            await self._flush(self._take_pending())
+
+    async def submit(self, post_id: int, owner_id: int, rtype: ReactionType, created_at) -> bool:
+        """Queue one reaction; returns False if the queue stayed full for ``put_timeout_ms``."""
+        item = {"post_id": post_id, "owner_id": owner_id, "type": rtype, "created_at": created_at}
+        try:
+            if self._put_timeout > 0:
+                await asyncio.wait_for(self._queue.put(item), timeout=self._put_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except (asyncio.QueueFull, asyncio.TimeoutError):
+            self.rejected += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "flush_retries": self.flush_retries,
+            "dropped": self.dropped,
+            "last_flush_ms": self.last_flush_ms,
+            "max_flush_ms": self.max_flush_ms,
+            "avg_flush_ms": self.total_flush_ms / self.flushes if self.flushes else 0.0,
+        }
+
+    def _take_pending(self) -> list[dict]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    async def _drain(self, block: bool) -> None:
+        """Move up to ``batch_size`` queued items into ``_pending``.
+
+        Items live in ``_pending`` rather than a local so that ``stop`` can still flush
+        them if the flusher is cancelled mid-drain.
+        """
+        batch = self._pending
+        if block:
+            batch.append(await self._queue.get())
+        elif not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        else:
+            return
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if not block or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._drain(block=True)
+                # Shield the write so a shutdown cancel cannot abort a batch already taken off the queue.
+                self._inflight = asyncio.ensure_future(self._flush(self._take_pending()))
+                await asyncio.shield(self._inflight)
+            except Exception:
+                # Never let one bad batch stop the flusher; the queue would fill up and
+                # every later reaction would be refused.
+                logger.exception("Reaction flusher failed; continuing with the next batch")
+                self.flush_errors += 1
+            self._inflight = None
+
+    async def _flush(self, batch: list[dict]) -> None:
+        """Write one batch, retrying until it lands or ``flush_attempts`` run out.
+
+        Transient errors (lost connection, pool timeout) retry the same rows after a
+        backoff, and so does an error while cleaning up after a failure. An integrity
+        error means posts were deleted after ``react`` queued their reactions: those rows
+        are dropped and the rest retried at once. Anything else, or running out of
+        attempts, drops the batch with a log line.
+        """
+        if not batch:
+            return
+        owners = {item["post_id"]: item["owner_id"] for item in batch}
+        rows = [{"post_id": item["post_id"], "type": item["type"], "created_at": item["created_at"]} for item in batch]
+        started = time.perf_counter()
+        for attempt in range(1, self._flush_attempts + 1):
+            written = False
+            transient = False
+            missing: set[int] = set()
+            try:
+                async with self._session_factory() as db:
+                    try:
+                        await insert_reactions(db, rows, owners, chunk_size=len(rows))
+                        written = True
+                    except Exception as error:
+                        failure, transient = error, _is_transient(error)
+                        await db.rollback()
+                        if isinstance(error, exc.IntegrityError):
+                            post_ids = {row["post_id"] for row in rows}
+                            missing = post_ids - set(await db.scalars(select(Post.id).where(Post.id.in_(post_ids))))
+            except Exception as error:
+                if written:
+                    # Committed; only closing the session failed.
+                    logger.warning("Closing the flush session failed", exc_info=error)
+                else:
+                    # The rollback or the post lookup failed too, typically because the
+                    # connection is gone: count the attempt as a transient failure.
+                    failure, transient, missing = error, True, set()
+            if written:
+                self._record_flush(len(rows), started)
+                return
+            self.flush_errors += 1
+            if missing:
+                kept = [row for row in rows if row["post_id"] not in missing]
+                logger.warning("Dropping %d buffered reactions for %d deleted posts", len(rows) - len(kept), len(missing))
+                self.dropped += len(rows) - len(kept)
+                rows = kept
+                if not rows:
+                    return
+            elif not transient:
+                break
+            if attempt < self._flush_attempts:
+                self.flush_retries += 1
+                if not missing:
+                    await asyncio.sleep(self._retry_backoff * 2 ** (attempt - 1))
+        logger.error("Failed to flush %d buffered reactions", len(rows), exc_info=failure)
+        self.dropped += len(rows)
+
+    def _record_flush(self, count: int, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.flushed += count
+        self.flushes += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+
+
+def get_reaction_buffer() -> ReactionBuffer | None:
+    return _buffer
+
+
+def buffer_startup() -> None:
+    global _buffer
+    if settings.reaction_buffer_enabled and _buffer is None:
+        _buffer = ReactionBuffer(
+            max_size=settings.reaction_buffer_max_size,
+            batch_size=settings.reaction_buffer_batch_size,
+            flush_interval_ms=settings.reaction_buffer_flush_interval_ms,
+            put_timeout_ms=settings.reaction_buffer_put_timeout_ms,
+            flush_attempts=settings.reaction_buffer_flush_attempts,
+            retry_backoff_ms=settings.reaction_buffer_retry_backoff_ms,
+        )
+        _buffer.start()
+
+
+async def buffer_shutdown() -> None:
+    global _buffer
+    if _buffer is not None:
+        await _buffer.stop()
+        _buffer = None
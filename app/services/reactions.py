@@ -0,0 +1,68 @@
+from collections import Counter, defaultdict
+from typing import Mapping, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.post import REACTION_COUNTS_VERSION_SEQ, PostReactionCount, Reaction, ReactionType
+from app.services.analytics_cache import invalidate_post_metrics
+from app.services.engagement_index import stage_counts
+
+REACTION_COLUMNS = [rtype.value for rtype in ReactionType]
+BULK_CHUNK_SIZE = 5000
+# Posts per counter upsert statement: each row binds 8 parameters, and Postgres allows
+# at most 32767 per statement.
+UPSERT_CHUNK_POSTS = 4000
+
+
+async def bump_reaction_counts(db: AsyncSession, counts: Mapping[tuple[int, ReactionType], int], owners: Mapping[int, int]) -> None:
+    """Add ``counts`` (keyed by ``(post_id, type)``) to ``post_reaction_counts``, one upsert
+    per ``UPSERT_CHUNK_POSTS`` posts.
+
+    ``owners`` maps every post id in ``counts`` to its owner, used when the counter row
+    does not exist yet.
+
+    Runs inside the caller's transaction so the counters commit atomically with the
+    ``Reaction`` rows they describe. Rows are written in ``post_id`` order so that
+    concurrent writers lock counter rows in the same order and cannot deadlock.
+    """
+    by_post: dict[int, dict[str, int]] = defaultdict(lambda: dict.fromkeys(REACTION_COLUMNS, 0))
+    for (post_id, rtype), n in counts.items():
+        by_post[post_id][ReactionType(rtype).value] += n
+    if not by_post:
+        return
+    rows = [
+        {"post_id": post_id, "owner_id": owners[post_id], **cols, "total_reactions": sum(cols.values())}
+        for post_id, cols in sorted(by_post.items())
+    ]
+    table = PostReactionCount.__table__
+    for start in range(0, len(rows), UPSERT_CHUNK_POSTS):
+        stmt = pg_insert(table).values(rows[start:start + UPSERT_CHUNK_POSTS])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.post_id],
+            set_={
+                **{col: table.c[col] + stmt.excluded[col] for col in REACTION_COLUMNS + ["total_reactions"]},
+                "version": REACTION_COUNTS_VERSION_SEQ.next_value(),
+            },
+        )
+        await db.execute(stmt)
+    invalidate_post_metrics(by_post)
+    stage_counts(db.sync_session, by_post, owners)
+
+
+async def insert_reactions(db: AsyncSession, rows: Sequence[dict], owners: Mapping[int, int], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+    """Insert pre-validated reaction rows (``post_id``, ``type``, ``created_at``) in chunks.
+
+    Each chunk is one multi-row ``INSERT`` plus one counter upsert. Everything commits
+    once at the end, so either all rows land or (on any error) none do and the caller
+    can retry the whole set. Returns the number of rows inserted.
+    """
+    inserted = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        await db.execute(insert(Reaction), chunk)
+        await bump_reaction_counts(db, Counter((row["post_id"], row["type"]) for row in chunk), owners)
+        inserted += len(chunk)
+    await db.commit()
+    return inserted
@@ -0,0 +1,81 @@
+import logging
+
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.post import Reaction
+from app.models.rollup import ReactionRollup, RollupGranularity, RollupWatermark
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "reaction_rollup"
+
+
+def _bucket(granularity: RollupGranularity, column):
+    # Truncate in UTC regardless of the connection's TimeZone, then convert back to timestamptz.
+    return func.timezone("UTC", func.date_trunc(granularity.value, func.timezone("UTC", column)))
+
+
+def _fold_range(granularity: RollupGranularity, low: int, high: int):
+    """``INSERT ... SELECT ... ON CONFLICT`` adding reactions with ``low < id <= high`` to the rollup."""
+    bucket = _bucket(granularity, Reaction.created_at)
+    source = (
+        select(Reaction.post_id, literal(granularity, ReactionRollup.__table__.c.granularity.type).label("granularity"), bucket.label("bucket_start"), Reaction.type, func.count())
+        .where(Reaction.id > low, Reaction.id <= high)
+        .group_by(Reaction.post_id, bucket, Reaction.type)
+    )
+    table = ReactionRollup.__table__
+    stmt = pg_insert(table).from_select(["post_id", "granularity", "bucket_start", "type", "count"], source)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.post_id, table.c.granularity, table.c.bucket_start, table.c.type],
+        set_={"count": table.c["count"] + stmt.excluded["count"]},
+    )
+
+
+async def aggregate_reaction_rollups() -> None:
+    """Fold reactions newer than the stored watermark into hourly and daily rollups.
+
+    Each run only folds up to the highest reaction id seen by the *previous* run. Ids are
+    handed out at insert time, so a reaction whose transaction commits late can carry
+    an id below ones already visible; waiting one run interval lets such transactions finish
+    before the watermark passes them.
+
+    Works through at most ``rollup_batch_size`` ids per transaction. The watermark row is
+    locked with ``SKIP LOCKED`` so concurrent runs in other workers back off instead of
+    double counting.
+    """
+    while True:
+        async with SessionLocal() as db:
+            mark = (
+                await db.execute(
+                    select(RollupWatermark.last_reaction_id, RollupWatermark.observed_max_id)
+                    .where(RollupWatermark.name == WATERMARK_NAME)
+                    .with_for_update(skip_locked=True)
+                )
+            ).first()
+            if mark is None:
+                return
+            low, target = mark
+            if target <= low:
+                top = await db.scalar(select(func.max(Reaction.id)))
+                await db.execute(
+                    update(RollupWatermark).where(RollupWatermark.name == WATERMARK_NAME).values(observed_max_id=top or low)
+                )
+                await db.commit()
+                return
+            high = min(target, low + settings.rollup_batch_size)
+            for granularity in RollupGranularity:
+                await db.execute(_fold_range(granularity, low, high))
+            await db.execute(
+                update(RollupWatermark).where(RollupWatermark.name == WATERMARK_NAME).values(last_reaction_id=high)
+            )
+            await db.commit()
+
+
+async def run_rollup_job() -> None:
+    try:
+        await aggregate_reaction_rollups()
+    except Exception:
+        logger.exception("Reaction rollup aggregation failed")
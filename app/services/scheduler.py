@@ -1,52 +1,456 @@
-from datetime import datetime, timezone
-import random
-from apscheduler.schedulers.background import BackgroundScheduler
-from sqlalchemy.orm import Session
+import asyncio
+from datetime import datetime, timedelta, timezone
+import heapq
+import logging
+import signal
+import time
+from typing import TYPE_CHECKING, Iterable
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import SessionLocal
+from app.core.config import settings
+from app.core.metrics import Histogram
+from app.db.session import SessionLocal, dispose_engines, get_engine
 from app.models.post import Post, PostStatus
+from app.services.partitions import maintain_reaction_partitions
+from app.services.publisher import publish_stats, publish_with_retry
+from app.services.rollups import run_rollup_job
 
-_scheduler: BackgroundScheduler | None = None
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+logger = logging.getLogger(__name__)
 
-def _simulate_linkedin_publish(post: Post) -> None:
-    _ = post.id
+_scheduler: "AsyncIOScheduler | None" = None
+_due_queue: "DueQueue | None" = None
+_publisher_task: asyncio.Task | None = None
+_inflight: set[asyncio.Task] = set()
 
+# Web processes NOTIFY this channel with comma-separated post ids whose schedule changed;
+# the standalone scheduler LISTENs on it. Payloads are capped at 8000 bytes by Postgres.
+SCHEDULE_CHANNEL = "post_schedule"
+NOTIFY_IDS_PER_MESSAGE = 500
+LISTEN_RETRY_SECONDS = 5
 
-def _tick_publish_due() -> None:
-    db: Session = SessionLocal()
+SCHEDULER_TICK_SECONDS = Histogram(
+    "scheduler_tick_seconds",
+    "Duration of scheduler runs: publishing a due batch, reconciling the queue, rolling up reactions.",
+    ("job",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+
+class DueQueue:
+    """Min-heap of ``(due_timestamp, post_id)`` with lazy deletion.
+
+    ``_due`` holds the live due time per post; heap entries that no longer match it are
+    stale and skipped when they reach the top.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int]] = []
+        self._due: dict[int, float] = {}
+        self.wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def ids(self) -> set[int]:
+        return set(self._due)
+
+    def due_of(self, post_id: int) -> float | None:
+        return self._due.get(post_id)
+
+    def push(self, post_id: int, due: float) -> None:
+        if self._due.get(post_id) == due:
+            return
+        head = self.next_due()
+        self._due[post_id] = due
+        heapq.heappush(self._heap, (due, post_id))
+        if head is None or due < head:
+            self.wakeup.set()
+
+    def push_many(self, entries: Iterable[tuple[int, float]]) -> None:
+        """Add or move many entries with a single re-heapify and at most one wakeup."""
+        head = self.next_due()
+        earliest = None
+        for post_id, due in entries:
+            if self._due.get(post_id) == due:
+                continue
+            self._due[post_id] = due
+            self._heap.append((due, post_id))
+            earliest = due if earliest is None else min(earliest, due)
+        if earliest is None:
+            return
+        heapq.heapify(self._heap)
+        if head is None or earliest < head:
+            self.wakeup.set()
+
+    def discard(self, post_id: int) -> None:
+        self._due.pop(post_id, None)
+
+    def next_due(self) -> float | None:
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list[int]:
+        ready: list[int] = []
+        while (head := self.next_due()) is not None and head <= now:
+            _, post_id = heapq.heappop(self._heap)
+            del self._due[post_id]
+            ready.append(post_id)
+        return ready
+
+
+def _due_timestamp(scheduled_at: datetime, scheduled_second: int | None) -> float:
+    if scheduled_at.tzinfo is None:
+        scheduled_at = scheduled_at.replace(tzinfo=timezone.utc)
+    return scheduled_at.replace(second=scheduled_second or 0, microsecond=0).timestamp()
+
+
+def schedule_post(post_id: int, scheduled_at: datetime | None, scheduled_second: int | None) -> None:
+    """Register (or move) a scheduled post's due time in this process's queue."""
+    if _due_queue is not None and scheduled_at is not None:
+        _due_queue.push(post_id, _due_timestamp(scheduled_at, scheduled_second))
+
+
+def schedule_posts(posts: Iterable[tuple[int, datetime, int | None]]) -> None:
+    """``schedule_post`` for many ``(post_id, scheduled_at, scheduled_second)`` at once."""
+    if _due_queue is not None:
+        _due_queue.push_many((post_id, _due_timestamp(at, second)) for post_id, at, second in posts)
+
+
+def unschedule_post(post_id: int) -> None:
+    if _due_queue is not None:
+        _due_queue.discard(post_id)
+
+
+async def notify_schedule_change(db: AsyncSession, post_ids: Iterable[int]) -> None:
+    """Tell the standalone scheduler that these posts were created, moved or removed.
+
+    Runs ``pg_notify`` in ``db``'s transaction, so the message goes out on commit and is
+    dropped on rollback. Does nothing on databases other than Postgres.
+    """
+    if get_engine().dialect.name != "postgresql":
+        return
+    ids = [str(post_id) for post_id in post_ids]
+    for start in range(0, len(ids), NOTIFY_IDS_PER_MESSAGE):
+        payload = ",".join(ids[start : start + NOTIFY_IDS_PER_MESSAGE])
+        await db.execute(select(func.pg_notify(SCHEDULE_CHANNEL, payload)))
+
+
+def _parse_schedule_notification(payload: str) -> list[int]:
+    return [int(value) for value in payload.split(",") if value.strip()]
+
+
+async def _apply_schedule_changes(post_ids: list[int]) -> None:
+    """Re-read notified posts and move, add or drop their entries in the due queue."""
+    if _due_queue is None or not post_ids:
+        return
+    async with SessionLocal() as db:
+        rows = (
+            await db.execute(
+                select(Post.id, Post.scheduled_at, Post.scheduled_second).where(
+                    Post.id.in_(post_ids), Post.status == PostStatus.scheduled
+                )
+            )
+        ).all()
+    schedule_posts((row.id, row.scheduled_at, row.scheduled_second) for row in rows)
+    for post_id in set(post_ids) - {row.id for row in rows}:
+        unschedule_post(post_id)
+
+
+async def _on_schedule_notification(connection, pid, channel, payload) -> None:
     try:
+        await _apply_schedule_changes(_parse_schedule_notification(payload))
+    except Exception:
+        # The next reconcile run picks the change up.
+        logger.exception("Could not apply schedule notification %r", payload)
+
+
+async def _listen_for_schedule_changes() -> None:
+    """Hold a connection that LISTENs on ``SCHEDULE_CHANNEL``, reconnecting when it drops.
+
+    Notifications sent while no connection is listening are lost, so every (re)connect is
+    followed by a reconcile run.
+    """
+    while True:
+        try:
+            async with get_engine().connect() as conn:
+                raw = (await conn.get_raw_connection()).driver_connection
+                closed = asyncio.Event()
+                on_close = lambda _connection: closed.set()  # noqa: E731
+                raw.add_termination_listener(on_close)
+                await raw.add_listener(SCHEDULE_CHANNEL, _on_schedule_notification)
+                try:
+                    logger.info("Listening for schedule changes on %s", SCHEDULE_CHANNEL)
+                    try:
+                        await reconcile_due_queue()
+                    except Exception:
+                        logger.exception("Reconcile after LISTEN failed; the reconcile job retries it")
+                    await closed.wait()
+                finally:
+                    # The connection goes back to the pool; don't leave it subscribed.
+                    if not raw.is_closed():
+                        raw.remove_termination_listener(on_close)
+                        await raw.remove_listener(SCHEDULE_CHANNEL, _on_schedule_notification)
+            logger.warning("Schedule listener connection closed; reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Schedule listener failed; reconnecting in %ss", LISTEN_RETRY_SECONDS)
+        await asyncio.sleep(LISTEN_RETRY_SECONDS)
+
+
+def due_queue_size() -> int:
+    """Scheduled posts currently held in this process's due-time queue."""
+    return len(_due_queue) if _due_queue is not None else 0
+
+
+def _is_due(now: datetime):
+    """SQL condition for ``scheduled_at + scheduled_second <= now``.
+
+    ``scheduled_at`` is always truncated to the minute, so this stays a plain range
+    predicate on the ``ix_post_scheduled_status`` index instead of date arithmetic.
+    """
+    minute = now.replace(second=0, microsecond=0)
+    return or_(
+        Post.scheduled_at < minute,
+        and_(Post.scheduled_at == minute, func.coalesce(Post.scheduled_second, 0) <= now.second),
+    )
+
+
+async def _claim_due(post_ids: list[int]) -> list:
+    """Move due posts among ``post_ids`` from ``scheduled`` to ``publishing`` and return them.
+
+    Rows are claimed with ``FOR UPDATE SKIP LOCKED`` in one set-based ``UPDATE``, so when
+    several workers wake for the same post only one of them gets it and the others move
+    on without waiting. The transaction commits before anything is published.
+    """
+    async with SessionLocal() as db:
         now = datetime.now(timezone.utc)
-        candidates = (
-            db.query(Post)
-            .filter(
-                Post.status == PostStatus.scheduled,
-                Post.scheduled_at <= now.replace(second=59, microsecond=999999),
+        due = (
+            select(Post.id)
+            .where(Post.id.in_(post_ids), Post.status == PostStatus.scheduled, _is_due(now))
+            .with_for_update(skip_locked=True)
+        )
+        claimed = (
+            await db.execute(
+                update(Post)
+                .where(Post.id.in_(due))
+                .values(status=PostStatus.publishing, publish_claimed_at=now)
+                .returning(Post.id, Post.owner_id, Post.content, Post.scheduled_at, Post.scheduled_second, Post.publish_claimed_at)
+                .execution_options(synchronize_session=False)
             )
-            .all()
+        ).all()
+        await db.commit()
+    return claimed
+
+
+async def _publish_claimed(post) -> bool:
+    """Publish one claimed post and record its outcome as soon as it is known.
+
+    The outcome is only written while this worker's claim still stands: a post that was
+    edited or unscheduled meanwhile, or whose claim timed out and was taken again, keeps
+    the newer state.
+    """
+    published_at = await publish_with_retry(post)
+    if published_at is None:
+        values = {"status": PostStatus.failed, "publish_claimed_at": None}
+    else:
+        publish_stats.record_lag(published_at.timestamp() - _due_timestamp(post.scheduled_at, post.scheduled_second))
+        values = {"status": PostStatus.published, "published_at": published_at, "publish_claimed_at": None}
+    async with SessionLocal() as db:
+        result = await db.execute(
+            update(Post)
+            .where(Post.id == post.id, Post.status == PostStatus.publishing, Post.publish_claimed_at == post.publish_claimed_at)
+            .values(**values)
+            .execution_options(synchronize_session=False)
         )
-        for post in candidates:
-            scheduled_second = post.scheduled_second or 0
-            if now >= post.scheduled_at.replace(second=scheduled_second, microsecond=0): 
-                _simulate_linkedin_publish(post)
-                post.status = PostStatus.published
-                post.published_at = now
-        if candidates:
-            db.commit()
-    finally:
-        db.close()
+        await db.commit()
+    if result.rowcount == 0:
+        logger.warning("Post %s changed while it was publishing; not marking it %s", post.id, values["status"].value)
+        return False
+    return published_at is not None
+
+
+async def _publish_due(post_ids: list[int]) -> int:
+    """Claim one batch of due posts and publish them on the worker pool; returns the number published."""
+    claimed = await _claim_due(post_ids)
+    results = await asyncio.gather(*(_publish_claimed(post) for post in claimed), return_exceptions=True)
+    for post, result in zip(claimed, results):
+        if isinstance(result, Exception):
+            logger.error("Failed to record the outcome of post %s; it is rescheduled once its claim times out", post.id, exc_info=result)
+    return sum(result is True for result in results)
+
+
+def _spawn_publish(post_ids: list[int]) -> None:
+    """Start one publish task per ``SCHEDULER_CLAIM_BATCH_SIZE`` ids.
+
+    Batches are claimed and published independently, so a slow post only holds up its
+    own batch rather than every post due after it.
+    """
+
+    async def run(batch: list[int]) -> None:
+        try:
+            with SCHEDULER_TICK_SECONDS.time("publish"):
+                await _publish_due(batch)
+        except Exception:
+            logger.exception("Failed to publish %d due posts; they will be retried on reconcile", len(batch))
+
+    for start in range(0, len(post_ids), settings.scheduler_claim_batch_size):
+        task = asyncio.create_task(run(post_ids[start:start + settings.scheduler_claim_batch_size]))
+        _inflight.add(task)
+        task.add_done_callback(_inflight.discard)
+
+
+async def _run_publisher(queue: DueQueue) -> None:
+    """Sleep until the earliest due time (or until an earlier one is pushed), then hand
+    the due posts to the publish workers without waiting for them to finish."""
+    while True:
+        head = queue.next_due()
+        delay = None if head is None else head - time.time()
+        if delay is None or delay > 0:
+            queue.wakeup.clear()
+            try:
+                await asyncio.wait_for(queue.wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        _spawn_publish(queue.pop_due(time.time()))
+
+
+async def _release_stale_claims() -> None:
+    """Return posts stuck in ``publishing`` (their worker died mid-publish) to ``scheduled``."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.publish_claim_timeout_seconds)
+    async with SessionLocal() as db:
+        await db.execute(
+            update(Post)
+            .where(Post.status == PostStatus.publishing, Post.publish_claimed_at < cutoff)
+            .values(status=PostStatus.scheduled, publish_claimed_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+
+async def reconcile_due_queue() -> None:
+    """Sync the in-memory queue with scheduled posts due within the reconcile horizon.
+
+    Picks up posts scheduled by other processes and drops ones that were published,
+    unscheduled or deleted elsewhere. Entries pushed while the query runs are left alone.
+    """
+    queue = _due_queue
+    if queue is None:
+        return
+    await _release_stale_claims()
+    known = queue.ids()
+    horizon = datetime.now(timezone.utc) + timedelta(seconds=settings.scheduler_horizon_seconds)
+    async with SessionLocal() as db:
+        rows = (
+            await db.execute(
+                select(Post.id, Post.scheduled_at, Post.scheduled_second).where(
+                    Post.status == PostStatus.scheduled,
+                    Post.scheduled_at <= horizon,
+                )
+            )
+        ).all()
+    found = set()
+    for post_id, scheduled_at, scheduled_second in rows:
+        found.add(post_id)
+        queue.push(post_id, _due_timestamp(scheduled_at, scheduled_second))
+    horizon_ts = horizon.timestamp()
+    for post_id in known - found:
+        due = queue.due_of(post_id)
+        if due is not None and due <= horizon_ts:
+            queue.discard(post_id)
+
+
+def _timed(job: str, fn):
+    async def run() -> None:
+        with SCHEDULER_TICK_SECONDS.time(job):
+            await fn()
+
+    return run
 
 
 def scheduler_startup() -> None:
-    global _scheduler
+    global _scheduler, _due_queue, _publisher_task
     if _scheduler is None:
-        _scheduler = BackgroundScheduler(timezone=str(timezone.utc))
-        _scheduler.add_job(_tick_publish_due, "interval", seconds=1, id="publish_due")
+        # Imported here so web processes that leave scheduling to a separate process
+        # never load APScheduler.
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+        _due_queue = DueQueue()
+        _publisher_task = asyncio.create_task(_run_publisher(_due_queue), name="publish-due")
+        _scheduler = AsyncIOScheduler(timezone=str(timezone.utc))
+        _scheduler.add_job(
+            _timed("reconcile", reconcile_due_queue),
+            "interval",
+            seconds=settings.scheduler_reconcile_seconds,
+            id="reconcile_due",
+            next_run_time=datetime.now(timezone.utc),
+        )
+        _scheduler.add_job(_timed("rollup", run_rollup_job), "interval", seconds=settings.rollup_interval_seconds, id="reaction_rollups")
+        _scheduler.add_job(
+            _timed("partitions", maintain_reaction_partitions),
+            "interval",
+            hours=6,
+            id="reaction_partitions",
+            next_run_time=datetime.now(timezone.utc),
+        )
         _scheduler.start()
 
 
-def scheduler_shutdown() -> None:
-    global _scheduler
+async def scheduler_shutdown() -> None:
+    global _scheduler, _due_queue, _publisher_task
     if _scheduler is not None:
         _scheduler.shutdown(wait=False)
         _scheduler = None
+    if _publisher_task is not None:
+        _publisher_task.cancel()
+        _publisher_task = None
+    _due_queue = None
+    if _inflight:
+        # Give in-flight publishes a chance to finish; anything left is released back to
+        # ``scheduled`` by the next process's stale-claim sweep.
+        await asyncio.wait(set(_inflight), timeout=settings.publish_timeout_seconds)
+
+
+async def _serve() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    scheduler_startup()
+    listener = None
+    if get_engine().dialect.name == "postgresql":
+        listener = asyncio.create_task(_listen_for_schedule_changes())
+    logger.info("Scheduler running")
+    try:
+        await stop.wait()
+    finally:
+        if listener is not None:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+        await scheduler_shutdown()
+        await dispose_engines()
+
+
+def main() -> None:
+    """Run publishing, reconcile, rollup and partition jobs without the web app.
+
+    Start it with ``python -m app.services.scheduler`` and set
+    ``SCHEDULER_IN_WEB_PROCESS=false`` on the web processes. On Postgres it LISTENs for
+    ``notify_schedule_change`` messages, so posts scheduled by web processes are queued
+    right away rather than on the next reconcile run.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    # Post's relationships name User, so its mapper has to be registered before the first query.
+    import app.models.user  # noqa: F401
+
+    asyncio.run(_serve())
+
+
+if __name__ == "__main__":
+    main()
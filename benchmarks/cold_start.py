@@ -0,0 +1,93 @@
+"""Cold-start benchmark: time to import ``app.main`` and serve the first request in a fresh interpreter.
+
+    python -m benchmarks.cold_start --runs 10 --top 15
+
+Each run starts a new Python process, as a serverless cold start would, and reports:
+- ``import_ms``: time to import ``app.main``
+- ``first_request_ms``: time for the first ``GET /health`` through the ASGI app, with no
+  lifespan events, as on Vercel
+- ``total_ms``: process wall time
+
+One extra run under ``-X importtime`` lists the slowest modules by cumulative import
+time. Output is JSON. Settings come from the environment or ``.env`` as usual, and no
+database connection is made.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.concurrency import _percentile
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def first_request():
+    import httpx
+    transport = httpx.ASGITransport(app=app.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://cold-start") as client:
+        t0 = time.perf_counter()
+        resp = await client.get("/health")
+        resp.raise_for_status()
+        return time.perf_counter() - t0
+
+first = asyncio.run(first_request())
+print(json.dumps({"import_ms": (imported - started) * 1000, "first_request_ms": first * 1000}))
+"""
+
+
+def _run_once() -> dict:
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["total_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def slowest_imports(top: int) -> list[dict]:
+    """Modules with the largest cumulative import time while importing ``app.main``."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"], capture_output=True, text=True, check=True)
+    modules = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        if self_us.isdigit():
+            modules.append({"module": name, "cumulative_ms": int(cumulative_us) / 1000, "self_ms": int(self_us) / 1000})
+    modules.sort(key=lambda m: m["cumulative_ms"], reverse=True)
+    return modules[:top]
+
+
+def _summary(values: list[float]) -> dict:
+    values = sorted(values)
+    return {
+        "median": round(statistics.median(values), 1),
+        "p95": round(_percentile(values, 95), 1),
+        "min": round(values[0], 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list (0 to skip)")
+    args = parser.parse_args()
+
+    runs = [_run_once() for _ in range(args.runs)]
+    report = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        **{key: _summary([run[key] for run in runs]) for key in ("import_ms", "first_request_ms", "total_ms")},
+    }
+    if args.top:
+        report["slowest_imports"] = slowest_imports(args.top)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
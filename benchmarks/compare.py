@@ -0,0 +1,67 @@
+"""Compare two ``benchmarks.scenarios`` reports and flag regressions.
+
+    python -m benchmarks.compare before.json after.json --threshold 0.10
+
+Prints one JSON object with the relative change of every endpoint's p50/p95/p99 and
+throughput, and exits with status 1 when any p95 or p99 grew, or throughput dropped,
+by more than ``--threshold``.
+"""
+import argparse
+import json
+import sys
+
+LATENCY_KEYS = ["p50_ms", "p95_ms", "p99_ms"]
+
+
+def _endpoints(report: dict) -> dict[tuple[str, str], dict]:
+    flat = {}
+    for scenario, result in report["scenarios"].items():
+        endpoints = result.get("endpoints", result)
+        for label, stats in endpoints.items():
+            if isinstance(stats, dict) and "p50_ms" in stats:
+                flat[(scenario, label)] = stats
+    return flat
+
+
+def _change(before: float, after: float) -> float | None:
+    return round((after - before) / before, 4) if before else None
+
+
+def compare(before: dict, after: dict, threshold: float) -> tuple[dict, list[str]]:
+    old, new = _endpoints(before), _endpoints(after)
+    changes: dict[str, dict] = {}
+    regressions: list[str] = []
+    for key in sorted(old.keys() & new.keys()):
+        name = " :: ".join(key)
+        delta = {stat: _change(old[key][stat], new[key][stat]) for stat in LATENCY_KEYS + ["per_sec"]}
+        changes[name] = delta
+        for stat in ("p95_ms", "p99_ms"):
+            if delta[stat] is not None and delta[stat] > threshold:
+                regressions.append(f"{name} {stat} +{delta[stat]:.1%}")
+        if delta["per_sec"] is not None and delta["per_sec"] < -threshold:
+            regressions.append(f"{name} per_sec {delta['per_sec']:.1%}")
+    return changes, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+    with open(args.before) as fh:
+        before = json.load(fh)
+    with open(args.after) as fh:
+        after = json.load(fh)
+    changes, regressions = compare(before, after, args.threshold)
+    print(json.dumps({
+        "before": before.get("commit"),
+        "after": after.get("commit"),
+        "changes": changes,
+        "regressions": regressions,
+    }, indent=2))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Login-storm benchmark: concurrent logins plus a /health probe to show other routes stay responsive.
+
+    python -m benchmarks.login_throughput --url http://localhost:8000 --users 50 --concurrency 64 --duration 20
+
+Creates ``--users`` accounts (ignoring "already registered"), then logs them in as fast as
+``--concurrency`` clients allow while one extra client polls ``/health``.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.concurrency import _percentile
+
+
+def _summary(latencies: list[float], elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def _login_worker(client: httpx.AsyncClient, accounts: list[tuple[str, str]], offset: int, deadline: float, latencies: list, errors: list) -> None:
+    i = offset
+    while time.perf_counter() < deadline:
+        email, password = accounts[i % len(accounts)]
+        i += 1
+        started = time.perf_counter()
+        resp = await client.post("/auth/login", data={"username": email, "password": password})
+        if resp.status_code == 200:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(resp.status_code)
+
+
+async def _health_probe(client: httpx.AsyncClient, deadline: float, latencies: list) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.05)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    accounts = [(f"bench-login-{i}@example.com", "bench-password") for i in range(args.users)]
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        for email, password in accounts:
+            await client.post("/auth/signup", json={"email": email, "password": password})
+        login_latencies: list[float] = []
+        health_latencies: list[float] = []
+        errors: list[int] = []
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            _health_probe(client, deadline, health_latencies),
+            *(_login_worker(client, accounts, n, deadline, login_latencies, errors) for n in range(args.concurrency)),
+        )
+        elapsed = time.perf_counter() - started
+    return {
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 3),
+        "login": {**_summary(login_latencies, elapsed), "errors": len(errors)},
+        "health_during_storm": _summary(health_latencies, elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""Drive a running API through scripted scenarios and report per-endpoint latency as JSON.
+
+    python -m benchmarks.seed --users 10000 --posts 1000000 --reactions 50000000 --truncate
+    uvicorn app.main:app --workers 4
+    python -m benchmarks.scenarios --url http://localhost:8000 --out before.json
+    # check out another commit, restart the server, then
+    python -m benchmarks.scenarios --url http://localhost:8000 --out after.json
+    python -m benchmarks.compare before.json after.json
+
+Scenarios (``--scenarios``, default all): ``login_storm``, ``react_burst``,
+``top_dashboards``, ``list_posts_paging`` and ``scheduler_spike``. They log in with the
+accounts created by ``benchmarks.seed``. ``scheduler_spike`` also needs ``--dsn``: it
+inserts posts due on the same minute boundary and reads publish lag back from the
+database, then deletes them.
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+import json
+import random
+import subprocess
+import time
+
+import httpx
+
+from benchmarks.concurrency import _percentile
+from benchmarks.seed import REACTION_TYPES, SEED_EMAIL, sync_dsn, zipf_sampler
+
+SCENARIOS = ["login_storm", "react_burst", "top_dashboards", "list_posts_paging", "scheduler_spike"]
+
+
+class Recorder:
+    """Latencies and error counts per endpoint label."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+
+    async def call(self, client: httpx.AsyncClient, label: str, method: str, path: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            resp = await client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            return None
+        if resp.status_code >= 400:
+            self.errors[label] += 1
+        else:
+            self.latencies[label].append(time.perf_counter() - started)
+        return resp
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        report = {}
+        for label in sorted(set(self.latencies) | set(self.errors)):
+            latencies = sorted(self.latencies[label])
+            report[label] = {
+                "requests": len(latencies),
+                "errors": self.errors[label],
+                "per_sec": round(len(latencies) / elapsed, 1),
+                "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+            }
+        return report
+
+
+async def _login(client: httpx.AsyncClient, index: int, password: str) -> dict:
+    resp = await client.post("/auth/login", data={"username": SEED_EMAIL.format(index), "password": password})
+    resp.raise_for_status()
+    return {"Authorization": "Bearer " + resp.json()["access_token"]}
+
+
+async def _login_many(client: httpx.AsyncClient, indexes: list[int], password: str) -> list[dict]:
+    slots = asyncio.Semaphore(32)
+
+    async def one(index: int) -> dict:
+        async with slots:
+            return await _login(client, index, password)
+
+    return await asyncio.gather(*(one(i) for i in indexes))
+
+
+async def _until(deadline: float, step) -> None:
+    while time.perf_counter() < deadline:
+        await step()
+
+
+async def login_storm(client: httpx.AsyncClient, args: argparse.Namespace) -> dict:
+    rec = Recorder()
+    deadline = time.perf_counter() + args.duration
+
+    async def step() -> None:
+        data = {"username": SEED_EMAIL.format(random.randrange(args.users)), "password": args.password}
+        await rec.call(client, "POST /auth/login", "POST", "/auth/login", data=data)
+
+    await asyncio.gather(*(_until(deadline, step) for _ in range(args.concurrency)))
+    return rec.summary()
+
+
+async def react_burst(client: httpx.AsyncClient, args: argparse.Namespace) -> dict:
+    admin = await _login(client, 0, args.password)
+    sample = zipf_sampler(args.posts, args.zipf_s, random.Random(args.seed))
+    rec = Recorder()
+    deadline = time.perf_counter() + args.duration
+
+    async def step() -> None:
+        post_id = sample(1)[0] + 1
+        path = f"/analytics/{post_id}/react?type={random.choice(REACTION_TYPES)}"
+        await rec.call(client, "POST /analytics/{id}/react", "POST", path, headers=admin)
+
+    await asyncio.gather(*(_until(deadline, step) for _ in range(args.concurrency)))
+    return rec.summary()
+
+
+async def top_dashboards(client: httpx.AsyncClient, args: argparse.Namespace) -> dict:
+    """Each client is one user's dashboard polling its top posts and the leader's metrics,
+    revalidating with ``If-None-Match`` like a browser would."""
+    users = await _login_many(client, [1 + i % max(args.users - 1, 1) for i in range(args.concurrency)], args.password)
+    rec = Recorder()
+    deadline = time.perf_counter() + args.duration
+
+    async def dashboard(headers: dict) -> None:
+        etags: dict[str, str] = {}
+        leader: str | None = None
+        while time.perf_counter() < deadline:
+            polls = [("GET /analytics/top", "/analytics/top?limit=10")]
+            if leader is not None:
+                polls.append(("GET /analytics/post/{id}", leader))
+            for label, path in polls:
+                conditional = {"If-None-Match": etags[path]} if path in etags else {}
+                resp = await rec.call(client, label, "GET", path, headers={**headers, **conditional})
+                if resp is None or resp.status_code != 200:
+                    continue
+                etags[path] = resp.headers.get("etag", "")
+                if path == polls[0][1] and resp.json()["items"]:
+                    leader = f"/analytics/post/{resp.json()['items'][0]['post_id']}"
+            if args.poll_interval:
+                await asyncio.sleep(args.poll_interval)
+
+    await asyncio.gather(*(dashboard(headers) for headers in users))
+    return rec.summary()
+
+
+async def list_posts_paging(client: httpx.AsyncClient, args: argparse.Namespace) -> dict:
+    admin = await _login(client, 0, args.password)
+    rec = Recorder()
+    deadline = time.perf_counter() + args.duration
+
+    async def step() -> None:
+        cursor = None
+        for page in range(args.max_pages):
+            params = {"limit": args.page_size, **({"cursor": cursor} if cursor else {})}
+            label = "GET /posts/ (first page)" if page == 0 else "GET /posts/ (cursor)"
+            resp = await rec.call(client, label, "GET", "/posts/", params=params, headers=admin)
+            if resp is None or resp.status_code != 200:
+                return
+            cursor = resp.json()["next_cursor"]
+            if cursor is None or time.perf_counter() >= deadline:
+                return
+
+    await asyncio.gather(*(_until(deadline, step) for _ in range(args.concurrency)))
+    return rec.summary()
+
+
+SPIKE_INSERT_SQL = """
+INSERT INTO post (owner_id, content, status, scheduled_at, scheduled_second, created_at)
+SELECT 1, 'spike ' || n, 'scheduled', %(due)s, 0, now()
+FROM generate_series(1, %(count)s) AS n
+RETURNING id
+"""
+
+SPIKE_LAG_SQL = """
+SELECT count(*) FILTER (WHERE status = 'published'),
+       count(*) FILTER (WHERE status = 'failed'),
+       percentile_cont(ARRAY[0.5, 0.95, 0.99]) WITHIN GROUP (ORDER BY extract(epoch FROM published_at - scheduled_at)),
+       max(extract(epoch FROM published_at - scheduled_at))
+FROM post
+WHERE id = ANY(%(ids)s)
+"""
+
+
+def _spike_insert(dsn: str, due: datetime, count: int) -> list[int]:
+    import psycopg2
+
+    with psycopg2.connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute(SPIKE_INSERT_SQL, {"due": due, "count": count})
+        ids = [row[0] for row in cur.fetchall()]
+        cur.execute("INSERT INTO post_reaction_counts (post_id, owner_id) SELECT id, owner_id FROM post WHERE id = ANY(%(ids)s)", {"ids": ids})
+    return ids
+
+
+def _spike_progress(dsn: str, ids: list[int], cleanup: bool = False) -> tuple:
+    import psycopg2
+
+    with psycopg2.connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute(SPIKE_LAG_SQL, {"ids": ids})
+        row = cur.fetchone()
+        if cleanup:
+            cur.execute("DELETE FROM post WHERE id = ANY(%(ids)s)", {"ids": ids})
+    return row
+
+
+async def scheduler_spike(client: httpx.AsyncClient, args: argparse.Namespace) -> dict:
+    """Schedule ``--spike-posts`` posts on one minute boundary, then measure how quickly
+    they are published and what the API latency looks like while that happens."""
+    if not args.dsn:
+        return {"skipped": "needs --dsn"}
+    admin = await _login(client, 0, args.password)
+    now = time.time()
+    due_ts = (int(now + args.spike_lead) // 60 + 1) * 60
+    due = datetime.fromtimestamp(due_ts, timezone.utc)
+    ids = await asyncio.to_thread(_spike_insert, args.dsn, due, args.spike_posts)
+    await asyncio.sleep(max(0.0, due_ts - time.time() - 5))
+
+    rec = Recorder()
+    done = asyncio.Event()
+
+    async def probe() -> None:
+        while not done.is_set():
+            await rec.call(client, "GET /health (during spike)", "GET", "/health")
+            await rec.call(client, "GET /analytics/top (during spike)", "GET", "/analytics/top", headers=admin)
+
+    probes = [asyncio.create_task(probe()) for _ in range(args.spike_probes)]
+    row = None
+    while time.time() < due_ts + args.spike_timeout:
+        row = await asyncio.to_thread(_spike_progress, args.dsn, ids)
+        if row[0] + row[1] >= len(ids):
+            break
+        await asyncio.sleep(0.5)
+    drained_after = time.time() - due_ts
+    done.set()
+    await asyncio.gather(*probes)
+    published, failed, lag_pcts, lag_max = await asyncio.to_thread(_spike_progress, args.dsn, ids, True)
+    lag_pcts = lag_pcts or [0.0, 0.0, 0.0]
+    return {
+        "posts": len(ids),
+        "published": published,
+        "failed": failed,
+        "drained_after_s": round(drained_after, 2),
+        "publish_lag_s": {
+            "p50": round(lag_pcts[0], 3),
+            "p95": round(lag_pcts[1], 3),
+            "p99": round(lag_pcts[2], 3),
+            "max": round(float(lag_max or 0), 3),
+        },
+        "endpoints": rec.summary(),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    random.seed(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency + args.spike_probes)
+    report = {
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "url": args.url,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "scenarios": {},
+    }
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        for name in args.scenarios:
+            report["scenarios"][name] = await globals()[name](client, args)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--dsn", help="database for scheduler_spike, e.g. postgresql://user:pw@localhost/db")
+    parser.add_argument("--scenarios", type=lambda v: v.split(","), default=SCENARIOS)
+    parser.add_argument("--users", type=int, default=10_000, help="as passed to benchmarks.seed")
+    parser.add_argument("--posts", type=int, default=1_000_000, help="as passed to benchmarks.seed")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--zipf-s", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per scenario")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--poll-interval", type=float, default=0.0, help="dashboard sleep between polls")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--max-pages", type=int, default=20)
+    parser.add_argument("--spike-posts", type=int, default=5000)
+    parser.add_argument("--spike-lead", type=float, default=60.0, help="minimum seconds between insert and due time")
+    parser.add_argument("--spike-timeout", type=float, default=300.0)
+    parser.add_argument("--spike-probes", type=int, default=8)
+    parser.add_argument("--out", help="also write the report to this file")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if args.dsn:
+        args.dsn = sync_dsn(args.dsn)
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Seed a synthetic dataset into Postgres with COPY for the benchmark scenarios.
+
+    python -m benchmarks.seed --users 10000 --posts 1000000 --reactions 50000000 --truncate
+
+Reactions per post follow a Zipf distribution (``--zipf-s``), so a few posts collect
+most of the engagement. Every seeded account is ``bench-<n>@example.com`` with password
+``--password``; ``bench-0`` is an admin. ``post_reaction_counts`` is rebuilt from the
+seeded reactions and the id sequences are moved past the copied rows. The same
+``--seed`` always produces the same dataset.
+
+Connects with ``--dsn`` (default: ``DATABASE_URL`` from the app settings) through psycopg2.
+"""
+import argparse
+import bisect
+from datetime import datetime, timedelta, timezone
+import io
+import itertools
+import json
+import random
+import time
+from typing import Iterable, Iterator
+
+import psycopg2
+
+from app.models.post import ReactionType
+
+REACTION_TYPES = [rtype.value for rtype in ReactionType]
+COPY_CHUNK_ROWS = 100_000
+SEED_EMAIL = "bench-{}@example.com"
+
+
+def sync_dsn(url: str) -> str:
+    """libpq DSN for a SQLAlchemy URL (drops the ``+driver`` suffix)."""
+    scheme, rest = url.split("://", 1)
+    return scheme.split("+", 1)[0] + "://" + rest
+
+
+class _CopyStream:
+    """Read-only file object over an iterator of text chunks, as ``copy_expert`` expects."""
+
+    def __init__(self, chunks: Iterable[str]) -> None:
+        self._chunks: Iterator[str] = iter(chunks)
+        self._current = io.BytesIO()
+
+    def read(self, size: int = 8192) -> bytes:
+        data = self._current.read(size)
+        while not data:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return b""
+            self._current = io.BytesIO(chunk.encode())
+            data = self._current.read(size)
+        return data
+
+
+def _chunked(lines: Iterable[str]) -> Iterator[str]:
+    it = iter(lines)
+    while chunk := list(itertools.islice(it, COPY_CHUNK_ROWS)):
+        yield "".join(chunk)
+
+
+def copy_rows(cur, table: str, columns: list[str], lines: Iterable[str]) -> None:
+    """COPY tab-separated ``lines`` (each ending in a newline) into ``table``."""
+    cols = ", ".join(f'"{c}"' for c in columns)
+    cur.copy_expert(f'COPY "{table}" ({cols}) FROM STDIN', _CopyStream(_chunked(lines)))
+
+
+def zipf_sampler(n: int, s: float, rng: random.Random):
+    """Return ``sample(k)`` drawing ``k`` indexes in ``[0, n)`` with Zipf(s) weights.
+
+    Ranks are shuffled so popularity is not correlated with id.
+    """
+    cumulative = list(itertools.accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+    order = list(range(n))
+    rng.shuffle(order)
+    total = cumulative[-1]
+
+    def sample(k: int) -> list[int]:
+        return [order[bisect.bisect_left(cumulative, rng.random() * total)] for _ in range(k)]
+
+    return sample
+
+
+def _user_lines(count: int, password_hash: str, now: datetime) -> Iterator[str]:
+    for i in range(count):
+        role = "admin" if i == 0 else "user"
+        yield f"{i + 1}\t{SEED_EMAIL.format(i)}\t{password_hash}\t{role}\t{now.isoformat()}\n"
+
+
+def _post_lines(count: int, users: int, rng: random.Random, now: datetime, span: timedelta) -> Iterator[str]:
+    for i in range(count):
+        created = now - span * rng.random()
+        published = created + timedelta(minutes=rng.randint(1, 600))
+        yield f"{i + 1}\t{rng.randint(1, users)}\tbench post {i}\tpublished\t{published.isoformat()}\t{created.isoformat()}\n"
+
+
+def _reaction_lines(count: int, sample, rng: random.Random, now: datetime, span: timedelta) -> Iterator[str]:
+    remaining = count
+    while remaining:
+        batch = min(remaining, COPY_CHUNK_ROWS)
+        for post_index in sample(batch):
+            created = now - span * rng.random()
+            yield f"{post_index + 1}\t{rng.choice(REACTION_TYPES)}\t{created.isoformat()}\n"
+        remaining -= batch
+
+
+REBUILD_COUNTS_SQL = """
+INSERT INTO post_reaction_counts (post_id, owner_id, "like", praise, empathy, interest, appreciation, total_reactions)
+SELECT p.id, p.owner_id,
+       count(r.id) FILTER (WHERE r.type = 'like'),
+       count(r.id) FILTER (WHERE r.type = 'praise'),
+       count(r.id) FILTER (WHERE r.type = 'empathy'),
+       count(r.id) FILTER (WHERE r.type = 'interest'),
+       count(r.id) FILTER (WHERE r.type = 'appreciation'),
+       count(r.id)
+FROM post p
+LEFT JOIN reaction r ON r.post_id = p.id
+GROUP BY p.id
+"""
+
+
+def seed(args: argparse.Namespace) -> dict:
+    from app.core.security import get_password_hash
+
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    span = timedelta(days=args.days)
+    timings: dict[str, float] = {}
+    with psycopg2.connect(args.dsn) as conn, conn.cursor() as cur:
+        if args.truncate:
+            cur.execute('TRUNCATE "user", post, reaction, post_reaction_counts, reaction_rollup RESTART IDENTITY CASCADE')
+            cur.execute("UPDATE rollup_watermark SET last_reaction_id = 0, observed_max_id = 0")
+
+        started = time.perf_counter()
+        copy_rows(cur, "user", ["id", "email", "hashed_password", "role", "created_at"], _user_lines(args.users, get_password_hash(args.password), now))
+        timings["users_s"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        copy_rows(cur, "post", ["id", "owner_id", "content", "status", "published_at", "created_at"], _post_lines(args.posts, args.users, rng, now, span))
+        timings["posts_s"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        sample = zipf_sampler(args.posts, args.zipf_s, rng)
+        copy_rows(cur, "reaction", ["post_id", "type", "created_at"], _reaction_lines(args.reactions, sample, rng, now, span))
+        timings["reactions_s"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        cur.execute(REBUILD_COUNTS_SQL)
+        for table in ("user", "post", "reaction"):
+            cur.execute(f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), coalesce((SELECT max(id) FROM \"{table}\"), 1))")
+        timings["counters_s"] = time.perf_counter() - started
+    with psycopg2.connect(args.dsn) as conn:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("VACUUM ANALYZE")
+    return {
+        "users": args.users,
+        "posts": args.posts,
+        "reactions": args.reactions,
+        "zipf_s": args.zipf_s,
+        "seed": args.seed,
+        "timings": {name: round(seconds, 2) for name, seconds in timings.items()},
+    }
+
+
+def main() -> None:
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=sync_dsn(settings.database_url))
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--reactions", type=int, default=50_000_000)
+    parser.add_argument("--zipf-s", type=float, default=1.1)
+    parser.add_argument("--days", type=int, default=90, help="spread created_at over this many days")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="empty the app tables first")
+    args = parser.parse_args()
+    print(json.dumps(seed(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Serialization benchmark: time to turn 10k result rows into a JSON body.
+
+    python -m benchmarks.serialization --rows 10000 --repeat 20
+
+Runs in-process, with no server or database. It builds ``--rows`` SQLAlchemy result rows
+shaped like ``list_posts`` and ``/analytics/top`` results and times each way of
+rendering them:
+
+- ``fastapi_default``: FastAPI's response-model validation, then ``json.dumps``.
+- ``fastapi_orjson``: the same validation, rendered by ``FastJSONResponse``.
+- ``rows_orjson``: rows rendered directly with ``rows_as_dicts``, skipping Pydantic.
+- ``columns_orjson`` (metrics only): the columnar ``/analytics/posts`` shape.
+
+Prints the median and best milliseconds per ``--rows`` rows as JSON.
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+import json
+import random
+import statistics
+import time
+from typing import Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+
+from app.core.serialization import FastJSONResponse, rows_as_dicts
+from app.models.post import PostStatus
+from app.schemas.analytics import PostMetric, TopPostsResponse
+from app.schemas.posts import PostPage
+
+POST_FIELDS = ["id", "owner_id", "content", "status", "scheduled_at", "published_at", "created_at"]
+METRIC_FIELDS = list(PostMetric.model_fields)
+
+
+def _rows(fields: list[str], values: list[tuple]) -> list:
+    return IteratorResult(SimpleResultMetaData(fields), iter(values)).all()
+
+
+def post_rows(n: int, rng: random.Random) -> list:
+    now = datetime.now(timezone.utc)
+    values = []
+    for i in range(n):
+        created = now - timedelta(seconds=i * 37)
+        scheduled = created + timedelta(days=1) if i % 3 == 0 else None
+        status = PostStatus.scheduled if scheduled else rng.choice([PostStatus.draft, PostStatus.published])
+        published = created + timedelta(minutes=5) if status == PostStatus.published else None
+        content = f"Post {i}: " + "lorem ipsum " * rng.randint(2, 20)
+        values.append((n - i, rng.randint(1, 1000), content, status, scheduled, published, created))
+    return _rows(POST_FIELDS, values)
+
+
+def metric_rows(n: int, rng: random.Random) -> list:
+    values = []
+    for i in range(n):
+        counts = [rng.randint(0, 500) for _ in range(5)]
+        total = sum(counts)
+        values.append((n - i, total, *counts, total * 10, total // 3, total // 5))
+    return _rows(METRIC_FIELDS, values)
+
+
+def _via_response_model(model, content: dict, response_class) -> Callable[[], bytes]:
+    field = create_response_field(name="response", type_=model)
+
+    async def render() -> bytes:
+        value = await serialize_response(field=field, response_content=content)
+        return response_class(value).body
+
+    def run() -> bytes:
+        coro = render()
+        # serialize_response does not await anything for a coroutine endpoint, so the
+        # coroutine finishes on its first step.
+        try:
+            coro.send(None)
+        except StopIteration as done:
+            return done.value
+        raise RuntimeError("serialize_response suspended")
+
+    return run
+
+
+def cases(rows: int, seed: int) -> dict[str, dict[str, Callable[[], bytes]]]:
+    rng = random.Random(seed)
+    posts = post_rows(rows, rng)
+    metrics = metric_rows(rows, rng)
+    return {
+        "posts": {
+            "fastapi_default": _via_response_model(PostPage, {"items": posts, "next_cursor": None}, JSONResponse),
+            "fastapi_orjson": _via_response_model(PostPage, {"items": posts, "next_cursor": None}, FastJSONResponse),
+            "rows_orjson": lambda: FastJSONResponse({"items": rows_as_dicts(posts), "next_cursor": None}).body,
+        },
+        "metrics": {
+            "fastapi_default": _via_response_model(TopPostsResponse, {"items": [row._asdict() for row in metrics]}, JSONResponse),
+            "fastapi_orjson": _via_response_model(TopPostsResponse, {"items": [row._asdict() for row in metrics]}, FastJSONResponse),
+            "rows_orjson": lambda: FastJSONResponse({"items": rows_as_dicts(metrics), "next_cursor": None}).body,
+            "columns_orjson": lambda: FastJSONResponse(dict(zip(METRIC_FIELDS, zip(*metrics)))).body,
+        },
+    }
+
+
+def measure(fn: Callable[[], bytes], repeat: int) -> dict:
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - started)
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "best_ms": round(min(timings) * 1000, 2),
+        "bytes": len(body),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    report = {"rows": args.rows, "repeat": args.repeat, "results": {}}
+    for shape, variants in cases(args.rows, args.seed).items():
+        results = {name: measure(fn, args.repeat) for name, fn in variants.items()}
+        baseline = results["fastapi_default"]["median_ms"]
+        for stats in results.values():
+            stats["speedup"] = round(baseline / stats["median_ms"], 2) if stats["median_ms"] else None
+        report["results"][shape] = results
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.services import partitions
+
+
+class FakeDb:
+    """Answers the catalog and default-partition queries; records every statement."""
+
+    def __init__(self, attached: list[str], default_months: list[datetime]) -> None:
+        self.attached = attached
+        self.default_months = default_months
+        self.statements: list[str] = []
+
+    async def execute(self, clause, params=None):
+        sql = str(clause)
+        self.statements.append(sql)
+        if "pg_inherits" in sql:
+            return [(name,) for name in self.attached]
+        if "SELECT DISTINCT date_trunc" in sql:
+            return [(month,) for month in self.default_months]
+        return SimpleNamespace(rowcount=3 if "DELETE FROM" in sql else 0)
+
+
+def test_past_months_in_default_partition_get_partitions(monkeypatch):
+    monkeypatch.setattr(partitions.settings, "reaction_partition_months_ahead", 1)
+    now = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    db = FakeDb(
+        attached=["reaction_p2026_10", "reaction_default"],
+        # Naive, as Postgres returns timezone('UTC', ...); includes a month that is already covered.
+        default_months=[datetime(2026, 7, 1), datetime(2026, 8, 1), datetime(2026, 10, 1)],
+    )
+    created = asyncio.run(partitions.ensure_reaction_partitions(db, now))
+    assert created == ["reaction_p2026_07", "reaction_p2026_08", "reaction_p2026_11"]
+    creates = [sql for sql in db.statements if "PARTITION OF reaction" in sql]
+    assert "FOR VALUES FROM ('2026-07-01T00:00:00+00:00') TO ('2026-08-01T00:00:00+00:00')" in creates[0]
+    # Rows are moved out of the default partition before each CREATE and put back after it.
+    first_create = db.statements.index(creates[0])
+    assert any("DELETE FROM \"reaction_default\"" in sql for sql in db.statements[:first_create])
+    assert "INSERT INTO reaction SELECT" in db.statements[first_create + 1]
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import exc
+
+from app.models.post import ReactionType
+from app.services import reaction_buffer
+from app.services.reaction_buffer import ReactionBuffer
+
+
+class BrokenRollbackSession:
+    """Stands in for an ``AsyncSession`` whose connection is gone: rollback raises."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def rollback(self):
+        raise exc.InterfaceError("ROLLBACK", {}, ConnectionError("connection is closed"))
+
+
+def _lost_connection():
+    return exc.OperationalError("INSERT", {}, ConnectionError("connection reset"))
+
+
+def test_flusher_survives_failing_rollback(monkeypatch):
+    written = []
+
+    async def insert_reactions(db, rows, owners, chunk_size):
+        if rows[0]["post_id"] == 1:
+            raise _lost_connection()
+        written.extend(rows)
+        return len(rows)
+
+    monkeypatch.setattr(reaction_buffer, "insert_reactions", insert_reactions)
+
+    async def scenario():
+        buffer = ReactionBuffer(100, 1, 5, flush_attempts=1, session_factory=BrokenRollbackSession)
+        buffer.start()
+        now = datetime.now(timezone.utc)
+        await buffer.submit(1, 10, ReactionType.like, now)
+        await buffer.submit(2, 10, ReactionType.like, now)
+        for _ in range(100):
+            if written:
+                break
+            await asyncio.sleep(0.01)
+        alive = not buffer._task.done()
+        await buffer.stop()
+        return buffer, alive
+
+    buffer, alive = asyncio.run(scenario())
+    assert alive
+    assert [row["post_id"] for row in written] == [2]
+    assert buffer.dropped == 1
+    assert buffer.flushed == 1
+
+
+def test_failing_rollback_counts_as_transient(monkeypatch):
+    calls = []
+
+    async def insert_reactions(db, rows, owners, chunk_size):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise _lost_connection()
+        return len(rows)
+
+    monkeypatch.setattr(reaction_buffer, "insert_reactions", insert_reactions)
+    buffer = ReactionBuffer(100, 10, 5, flush_attempts=3, session_factory=BrokenRollbackSession)
+    item = {"post_id": 1, "owner_id": 10, "type": ReactionType.like, "created_at": datetime.now(timezone.utc)}
+    asyncio.run(buffer._flush([item, item]))
+    assert calls == [2, 2]
+    assert buffer.flush_retries == 1
+    assert buffer.flushed == 2
+    assert buffer.dropped == 0
+
+
+def test_run_loop_survives_unexpected_flush_error(monkeypatch):
+    async def scenario():
+        buffer = ReactionBuffer(100, 1, 5)
+        flushed = []
+
+        async def flush(batch):
+            if batch and batch[0]["post_id"] == 1:
+                raise RuntimeError("boom")
+            flushed.extend(batch)
+
+        monkeypatch.setattr(buffer, "_flush", flush)
+        buffer.start()
+        now = datetime.now(timezone.utc)
+        await buffer.submit(1, 10, ReactionType.like, now)
+        await buffer.submit(2, 10, ReactionType.like, now)
+        for _ in range(100):
+            if flushed:
+                break
+            await asyncio.sleep(0.01)
+        await buffer.stop()
+        return buffer, flushed
+
+    buffer, flushed = asyncio.run(scenario())
+    assert [item["post_id"] for item in flushed] == [2]
+    assert buffer.flush_errors == 1
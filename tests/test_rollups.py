@@ -0,0 +1,16 @@
+import re
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.models.rollup import RollupGranularity
+from app.services.rollups import _fold_range
+
+
+@pytest.mark.parametrize("granularity", list(RollupGranularity))
+def test_fold_range_binds_granularity_as_enum(granularity):
+    sql = str(_fold_range(granularity, 0, 100).compile(dialect=asyncpg.dialect()))
+    selected = re.search(r"SELECT reaction\.post_id, (\S+) AS granularity", sql)
+    assert selected is not None
+    assert selected.group(1) == "$1::rollup_granularity"
+    assert "::VARCHAR AS granularity" not in sql
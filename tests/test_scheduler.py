@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import logging
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.post import PostStatus
+from app.services import publisher, scheduler
+
+CLAIMED_AT = datetime(2026, 1, 1, 12, 0, 5, tzinfo=timezone.utc)
+
+
+class RecordingSession:
+    """Collects outcome ``UPDATE``s instead of running them."""
+
+    def __init__(self, log: list, rowcount: int = 1) -> None:
+        self.log = log
+        self.rowcount = rowcount
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, stmt):
+        self.log.append(stmt)
+        return SimpleNamespace(rowcount=self.rowcount)
+
+    async def commit(self):
+        pass
+
+
+def _claimed(post_id: int):
+    due = CLAIMED_AT - timedelta(seconds=5)
+    return SimpleNamespace(
+        id=post_id, owner_id=1, content="hello", scheduled_at=due.replace(second=0), scheduled_second=due.second, publish_claimed_at=CLAIMED_AT
+    )
+
+
+def _post_id(stmt) -> int:
+    return stmt.compile(dialect=postgresql.dialect()).params["id_1"]
+
+
+@pytest.fixture
+def stub_publisher(monkeypatch):
+    """Route publishes to a per-test stub and record outcome writes in ``writes``."""
+    writes: list = []
+    state = {"rowcount": 1, "publish": None}
+    monkeypatch.setattr(publisher, "_slots", None)
+    monkeypatch.setattr(publisher.settings, "publish_backoff_seconds", 0.0)
+    monkeypatch.setattr(scheduler, "SessionLocal", lambda: RecordingSession(writes, state["rowcount"]))
+
+    async def publish(post):
+        await state["publish"](post)
+
+    publisher.set_publisher(publish)
+    yield writes, state
+    publisher.set_publisher(publisher.simulate_linkedin_publish)
+
+
+def test_outcome_update_requires_the_claim_to_stand(stub_publisher):
+    writes, state = stub_publisher
+
+    async def ok(post):
+        pass
+
+    state["publish"] = ok
+    assert asyncio.run(scheduler._publish_claimed(_claimed(7))) is True
+    (stmt,) = writes
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "post.status = %(status_1)s" in sql
+    assert "post.publish_claimed_at = %(publish_claimed_at_1)s" in sql
+    assert compiled.params["status_1"] == PostStatus.publishing
+    assert compiled.params["publish_claimed_at_1"] == CLAIMED_AT
+    assert compiled.params["status"] == PostStatus.published
+
+
+def test_outcome_for_a_lost_claim_is_not_counted(stub_publisher, caplog):
+    writes, state = stub_publisher
+
+    async def ok(post):
+        pass
+
+    state["publish"] = ok
+    state["rowcount"] = 0
+    with caplog.at_level(logging.WARNING, logger=scheduler.__name__):
+        assert asyncio.run(scheduler._publish_claimed(_claimed(7))) is False
+    assert "changed while it was publishing" in caplog.text
+
+
+def test_failed_publish_is_recorded_as_failed(stub_publisher, monkeypatch):
+    writes, state = stub_publisher
+    monkeypatch.setattr(publisher.settings, "publish_max_attempts", 2)
+
+    async def broken(post):
+        raise RuntimeError("LinkedIn is down")
+
+    state["publish"] = broken
+    assert asyncio.run(scheduler._publish_claimed(_claimed(7))) is False
+    (stmt,) = writes
+    assert stmt.compile(dialect=postgresql.dialect()).params["status"] == PostStatus.failed
+
+
+@pytest.mark.parametrize("batch_size", [1, 10])
+def test_slow_post_does_not_hold_back_others(stub_publisher, monkeypatch, batch_size):
+    """Outcomes are written per post, and (with small batches) later batches are
+    claimed while an earlier one is still publishing."""
+    writes, state = stub_publisher
+    claims: list[list[int]] = []
+
+    async def claim_due(post_ids):
+        claims.append(list(post_ids))
+        return [_claimed(post_id) for post_id in post_ids]
+
+    monkeypatch.setattr(scheduler, "_claim_due", claim_due)
+    monkeypatch.setattr(scheduler.settings, "scheduler_claim_batch_size", batch_size)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def publish(post):
+            if post.id == 1:
+                await release.wait()
+
+        state["publish"] = publish
+        scheduler._spawn_publish([1, 2, 3, 4])
+        for _ in range(100):
+            if len(writes) == 3:
+                break
+            await asyncio.sleep(0.01)
+        written_before_release = [_post_id(stmt) for stmt in writes]
+        release.set()
+        await asyncio.wait(set(scheduler._inflight))
+        return written_before_release
+
+    written_before_release = asyncio.run(scenario())
+    assert sorted(written_before_release) == [2, 3, 4]
+    assert sorted(_post_id(stmt) for stmt in writes) == [1, 2, 3, 4]
+    assert sorted(sum(claims, [])) == [1, 2, 3, 4]
+    assert len(claims) == (4 if batch_size == 1 else 1)
+
+
+def test_schedule_notifications_fit_the_payload_limit():
+    statements: list = []
+    asyncio.run(scheduler.notify_schedule_change(RecordingSession(statements), range(1, 1202)))
+    args = [[bind.value for bind in stmt.selected_columns[0].clauses] for stmt in statements]
+    assert {channel for channel, _ in args} == {scheduler.SCHEDULE_CHANNEL}
+    payloads = [payload for _, payload in args]
+    assert [len(scheduler._parse_schedule_notification(p)) for p in payloads] == [500, 500, 201]
+    assert all(len(p) < 8000 for p in payloads)
+    assert sum((scheduler._parse_schedule_notification(p) for p in payloads), []) == list(range(1, 1202))
+
+
+def test_notification_requeues_scheduled_posts_and_drops_the_rest(monkeypatch):
+    due = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+    queue = scheduler.DueQueue()
+    queue.push(2, due.timestamp())
+    queue.push(3, due.timestamp())
+
+    class LookupSession(RecordingSession):
+        async def execute(self, stmt):
+            # Post 1 is (re)scheduled; post 2 was unscheduled and post 3 deleted.
+            return SimpleNamespace(all=lambda: [SimpleNamespace(id=1, scheduled_at=due, scheduled_second=30)])
+
+    monkeypatch.setattr(scheduler, "_due_queue", queue)
+    monkeypatch.setattr(scheduler, "SessionLocal", lambda: LookupSession([]))
+    asyncio.run(scheduler._on_schedule_notification(None, 0, scheduler.SCHEDULE_CHANNEL, "1,2,3"))
+    assert len(queue) == 1
+    assert queue.pop_due(due.timestamp() + 30) == [1]